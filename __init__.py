@@ -1,27 +1,33 @@
 """The Visonic Alarm integration."""
 from __future__ import annotations
 
+from datetime import timedelta
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import (
-    async_track_time_interval,
-    async_call_later,
-)
+from homeassistant.core import HomeAssistant
 import logging
 
-from .const import DOMAIN, DOMAINCLIENT, DOMAINDATA, DOMAINCLIENTTASK
+from .const import (
+    CONNECTION_KEYS,
+    DOMAIN,
+    PENDING_SESSIONS,
+)
+from .account import async_release_account
 from .client import VisonicHandler
-
-
-from datetime import timedelta
+from .coordinator import VisonicDataUpdateCoordinator
+from .services import async_setup_services
+from .store import VisonicStore
 
 _LOGGER = logging.getLogger(__name__)
 
-# Define platform - alarm control panel
-PLATFORMS: list[Platform] = [Platform.ALARM_CONTROL_PANEL]
+# Define platforms - alarm control panel, zone binary sensors and device sensors
+PLATFORMS: list[Platform] = [
+    Platform.ALARM_CONTROL_PANEL,
+    Platform.BINARY_SENSOR,
+    Platform.SENSOR,
+]
 
 
 # async def async_update_device_registry(hass, config_entry, client, data):
@@ -43,6 +49,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Visonic Alarm from a config entry."""
 
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
 
     _LOGGER.debug("************* create connection here **************")
 
@@ -52,55 +59,111 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         f"Starting Visonic Alarm with entry id={entry.entry_id} (uuid={entry.data['uuid']})"
     )
 
+    store = VisonicStore(hass, entry.entry_id)
+    await store.async_load()
+    # A new entry starts from the session its config flow logged in with.
+    pending = hass.data[DOMAIN].get(PENDING_SESSIONS, {})
+    session = pending.pop(entry.data["uuid"], None)
+    if session and not store.data.get("session_token"):
+        store.async_update(**session)
+
     # create client and connect to the panel
     try:
         # Save the client ref
-        client = VisonicHandler(hass, entry, entry.data["panel_id"])
-
-        # Perform login sequence.
-        await client.async_login()
-
-        # After a small delay in letting the API server speak to the panel, attempt to get health data.
-        # speeds up start time, only call if interval is greater than 30s.
-        if entry.data["update_interval"] > 30:
-            async_call_later(hass, 30, client.update)
-
-        # Schedule periodic updates as defined by the user interval.
-        update_tracker = async_track_time_interval(
-            hass, client.update, timedelta(seconds=entry.data["update_interval"])
-        )
+        client = VisonicHandler(hass, entry, entry.data["panel_id"], store)
 
-        # update_tracker = async_track_time_interval(
-        #     hass, client.update, timedelta(seconds=15)
-        # )
+        # Poll the panel on the adaptive interval, one refresh in flight at a time.
+        coordinator = VisonicDataUpdateCoordinator(hass, client)
+        entry.async_on_unload(coordinator.fleet.async_register(entry.entry_id))
 
         # Save the data for platforms to access.
         hass.data[DOMAIN][entry.entry_id] = {
             "client": client,
-            "updates": update_tracker,
+            "coordinator": coordinator,
+            "platforms_loaded": False,
         }
 
-        # Set up the actual alarm panel
-        hass.async_create_task(
-            hass.config_entries.async_forward_entry_setup(entry, "alarm_control_panel")
-        )
+        if client.restore():
+            # Start from the cached state and revalidate the session in the background.
+            coordinator.async_set_updated_data(client.status)
+            client.async_create_task(coordinator.async_resume())
+            await _async_forward_setups(hass, entry)
+        else:
+            # Nothing cached to build the entities from, log in without holding
+            # up bootstrap and set up the platforms once the panel info is known.
+            client.async_create_task(_async_connect(hass, entry))
 
-        # entry.async_on_unload(entry.add_update_listener(update_listener))
+        entry.async_on_unload(entry.add_update_listener(async_update_listener))
 
         # return true to indicate success
         return True
 
     except Exception as error:
         _LOGGER.error("Visonic Panel could not be reached: [%s]", error)
+        async_release_account(hass, entry)
         raise ConfigEntryNotReady
 
     return False
 
 
+async def _async_connect(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Log in with retry, then refresh and set up the platforms.
+
+    Runs as a task of the client, so unloading the entry cancels it.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    if not await data["client"].async_connect():
+        return
+    await data["coordinator"].async_refresh()
+    await _async_forward_setups(hass, entry)
+
+
+async def _async_forward_setups(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Set up the actual alarm panel and zones."""
+    hass.data[DOMAIN][entry.entry_id]["platforms_loaded"] = True
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+
+async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed settings, reloading only when the login changed."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data["client"]
+    if client.connection != {key: entry.data[key] for key in CONNECTION_KEYS}:
+        # The cached session belongs to the old login.
+        await client.store.async_reset()
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    client.async_apply_options()
+    coordinator = data["coordinator"]
+    interval = timedelta(seconds=client.scheduler.interval)
+    if interval < coordinator.update_interval:
+        # Poll now so the shorter interval applies from here on, unless the
+        # background login is still running, its first refresh picks it up.
+        coordinator.update_interval = interval
+        if client.api is not None:
+            await coordinator.async_request_refresh()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached session of a deleted entry."""
+    await VisonicStore(hass, entry.entry_id).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN][entry.entry_id]["updates"]()
-        hass.data[DOMAIN].pop(entry.entry_id)
+    if not hass.data[DOMAIN][entry.entry_id]["platforms_loaded"]:
+        # Still logging in, the client cancels the task below.
+        unload_ok = True
+    else:
+        unload_ok = await hass.config_entries.async_unload_platforms(
+            entry, PLATFORMS
+        )
+    if unload_ok:
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        # Stop the refresh timer, then the tasks still running for the entry.
+        await data["coordinator"].async_shutdown()
+        await data["client"].async_close()
+        async_release_account(hass, entry)
 
     return unload_ok
@@ -0,0 +1,108 @@
+"""Cloud account shared by the config entries of one Visonic login."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import VisonicCloudApi, VisonicUnsupportedError
+from .const import ACCOUNTS, DEFAULT_RATE_LIMIT, DOMAIN
+from .fleet import async_get_fleet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VisonicAccount:
+    """Log into a cloud account once and hand out per-panel API clients."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        email: str,
+        password: str,
+        app_id: str,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+    ) -> None:
+        self.hass = hass
+        self.host = host
+        self.email = email
+        self.password = password
+        self.api = VisonicCloudApi(async_get_clientsession(hass), host, app_id)
+        # Panel clients inherit the throttle, so it covers the whole account.
+        self.api.throttle = async_get_fleet(hass).throttle(host, rate_limit)
+        self.panels: list[dict[str, Any]] = []
+        self.use_library = False
+        self.entry_ids: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def logged_in(self) -> bool:
+        return self.use_library or self.api.user_token is not None
+
+    async def async_login(self) -> None:
+        """Authenticate and list the panels, unless another entry already did."""
+        async with self._lock:
+            if self.logged_in:
+                return
+            try:
+                await self.api.async_check_version()
+            except VisonicUnsupportedError as err:
+                # Each entry falls back to its own library client.
+                _LOGGER.warning(f"{err}, falling back to visonicalarm library")
+                self.use_library = True
+                return
+
+            await self.api.async_authenticate(self.email, self.password)
+            _LOGGER.info(f"Successfully authenticated {self.email} on {self.host}")
+
+            # Quick check to confirm panels are registered.
+            self.panels = await self.api.async_get_panels()
+            if self.panels:
+                panel_ids = [panel["panel_serial"] for panel in self.panels]
+                _LOGGER.info(f"Available panels={panel_ids}")
+
+    def invalidate(self, user_token: str | None) -> None:
+        """Drop a rejected user token so the next login authenticates again."""
+        if self.api.user_token == user_token:
+            self.api.user_token = None
+
+    def panel_api(self) -> VisonicCloudApi:
+        """Return an API client for one panel sharing this account's user token."""
+        return self.api.panel_api()
+
+
+def async_get_account(hass: HomeAssistant, entry: ConfigEntry) -> VisonicAccount:
+    """Return the account for the entry's host and email, creating it if needed."""
+    accounts = hass.data[DOMAIN].setdefault(ACCOUNTS, {})
+    key = (entry.data["host"], entry.data["email"].lower())
+    if (account := accounts.get(key)) is None:
+        account = accounts[key] = VisonicAccount(
+            hass,
+            entry.data["host"],
+            entry.data["email"],
+            entry.data["password"],
+            entry.data["uuid"],
+            entry.data.get("rate_limit", DEFAULT_RATE_LIMIT),
+        )
+    elif account.password != entry.data["password"]:
+        # Changed by the options or reauth flow while another entry held the
+        # account, the token stays valid but the next login needs the new one.
+        account.password = entry.data["password"]
+    account.entry_ids.add(entry.entry_id)
+    return account
+
+
+def async_release_account(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the entry, dropping the account when no entries use it."""
+    accounts = hass.data[DOMAIN].get(ACCOUNTS, {})
+    key = (entry.data["host"], entry.data["email"].lower())
+    if (account := accounts.get(key)) is None:
+        return
+    account.entry_ids.discard(entry.entry_id)
+    if not account.entry_ids:
+        accounts.pop(key)
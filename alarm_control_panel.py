@@ -1,11 +1,8 @@
 """Create a connection to a Visonic PowerMax or PowerMaster Alarm System (Alarm Panel Control)."""
 
-from datetime import timedelta
+import asyncio
 import logging
-import re
-import voluptuous as vol
-
-from homeassistant.auth.permissions.const import POLICY_CONTROL
+import time
 
 import homeassistant.components.alarm_control_panel as alarm
 from homeassistant.components.alarm_control_panel.const import (
@@ -20,23 +17,36 @@ from homeassistant.const import (
     STATE_ALARM_ARMED_HOME,
     STATE_ALARM_ARMING,
     STATE_ALARM_DISARMED,
-    STATE_ALARM_PENDING,
-    STATE_ALARM_TRIGGERED,
+    STATE_ALARM_DISARMING,
     STATE_UNKNOWN,
 )
 
-from homeassistant.core import HomeAssistant, valid_entity_id
-from homeassistant.exceptions import HomeAssistantError, Unauthorized, UnknownUser
-import homeassistant.helpers.config_validation as cv
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers import entity_platform, service
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .api import ALL_PARTITIONS, VisonicApiError
 from .client import VisonicHandler
-from .const import DOMAIN, DOMAINCLIENT, DOMAINDATA
+from .coordinator import VisonicDataUpdateCoordinator
+from .status import PartitionStatus
+from .const import (
+    COMMAND_CONFIRM_INTERVAL,
+    COMMAND_CONFIRM_TIMEOUT,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Visonic command: (state shown while pending, state that confirms it)
+COMMAND_STATES = {
+    "DISARM": (STATE_ALARM_DISARMING, STATE_ALARM_DISARMED),
+    "HOME": (STATE_ALARM_ARMING, STATE_ALARM_ARMED_HOME),
+    "AWAY": (STATE_ALARM_ARMING, STATE_ALARM_ARMED_AWAY),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -46,37 +56,79 @@ async def async_setup_entry(
         "alarm control panel async_setup_entry called ****************************"
     )
     if DOMAIN in hass.data:
-        # Get the client
-        client = hass.data[DOMAIN][entry.entry_id]["client"]
-        # Create the alarm controlpanel
-        va = VisonicAlarmPanel(client)
-        # Add it to HA
-        devices = [va]
-        async_add_entities(devices, True)
+        # Get the coordinator, it holds the client
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        added = set()
+
+        @callback
+        def async_add_partitions():
+            """Create an alarm control panel for each partition not seen yet.
+
+            A transport that can only command every partition at once gets a
+            single panel, for the primary partition.
+            """
+            client = coordinator.client
+            if not client.partitions:
+                # Until a status arrives the primary partition isn't known, and
+                # its entity takes the panel's unique id.
+                return
+            partitions = (
+                client.partitions
+                if client.api is None or client.api.partitioned
+                else [client.primary_partition]
+            )
+            devices = [
+                VisonicAlarmPanel(coordinator, partition)
+                for partition in partitions
+                if partition not in added
+            ]
+            if devices:
+                added.update(device.partition for device in devices)
+                # Add it to HA, state is pushed by the coordinator
+                async_add_entities(devices)
+
+        async_add_partitions()
+        # Partitions may only be known after the first status fetch.
+        entry.async_on_unload(coordinator.async_add_listener(async_add_partitions))
 
     platform = entity_platform.async_get_current_platform()
     _LOGGER.info("alarm control panel async_setup_entry called {0}".format(platform))
 
 
-class VisonicAlarmPanel(alarm.AlarmControlPanelEntity):
+class VisonicAlarmPanel(CoordinatorEntity, alarm.AlarmControlPanelEntity):
     """Representation of a Visonic alarm control panel."""
 
-    def __init__(self, client: VisonicHandler):
+    def __init__(self, coordinator: VisonicDataUpdateCoordinator, partition: int):
         """Initialize a Visonic security alarm."""
-        _LOGGER.info(f"Initialising alarm control panel... client: {client}")
+        super().__init__(coordinator)
+        client: VisonicHandler = coordinator.client
+        _LOGGER.debug(f"Initialising alarm control panel... client: {client}")
         self._client = client
+        self.partition = partition
         self._mystate = STATE_UNKNOWN  # TODO
+        # Shown while a command is awaiting confirmation from the cloud.
+        self._optimistic_state = None
+        self._confirm_task = None
         self._myname = self._client.unique_id
+        if partition != self._client.primary_partition:
+            self._myname = f"{self._myname} partition {partition}"
         _LOGGER.debug("Initialising alarm control panel {0}".format(self._myname))
         self._device_state_attributes = {}
         self._users = {}
         self._doneUsers = False
         self._last_triggered = ""
-        self._dispatcher = f"VISONIC_{self._client.panel_id}"
+        self._dispatcher = self._client.signal
         self._panel = self._client.panel_id
+        self._was_available = None
+        self._update_state(
+            self._client.connected,
+            self._client.partitions.get(partition),
+            self._client.events.get_changed_by(partition),
+        )
 
     async def async_added_to_hass(self):
         """Register callbacks."""
+        await super().async_added_to_hass()
         # Register for dispatcher calls to update the state
         self.async_on_remove(
             async_dispatcher_connect(self.hass, self._dispatcher, self.onChange)
@@ -84,23 +136,43 @@ class VisonicAlarmPanel(alarm.AlarmControlPanelEntity):
 
     async def async_will_remove_from_hass(self):
         """Remove from hass."""
+        self._cancel_confirm()
         await super().async_will_remove_from_hass()
         self._client = None
         _LOGGER.debug("alarm control panel async_will_remove_from_hass")
 
-    def onChange(self, event_id: int, datadictionary: dict):
-        """HA Event Callback."""
-        self.schedule_update_ha_state(True)
+    @callback
+    def onChange(self, panel_id: str, datadictionary: dict):
+        """Apply status or a command pushed by the VisonicHandler."""
+        if "command" in datadictionary:
+            if datadictionary["partition"] in (ALL_PARTITIONS, self.partition):
+                self._async_command_sent(datadictionary["command"])
+            return
+        if "options" in datadictionary:
+            # The code policy changed, the state itself didn't.
+            self._update_state(*self._applied)
+            self.async_write_ha_state()
+            return
+
+        applied = (
+            datadictionary["connected"],
+            datadictionary["partitions"].get(self.partition),
+            datadictionary["changed_by"].get(self.partition),
+        )
+        if applied == self._applied:
+            return
+        self._update_state(*applied)
+        self.async_write_ha_state()
 
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
-        return self._client.unique_id
+        return self._myname
 
     @property
     def name(self):
         """Return the name of the alarm."""
-        return self._client.unique_id
+        return self._myname
 
     @property
     def changed_by(self):
@@ -113,8 +185,8 @@ class VisonicAlarmPanel(alarm.AlarmControlPanelEntity):
         if self._client is not None:
             return {
                 "manufacturer": self._client.brand,
-                "identifiers": {(DOMAIN, self._myname)},
-                "name": self._myname,
+                "identifiers": {(DOMAIN, self._client.unique_id)},
+                "name": self._client.unique_id,
                 "model": self._client.model,
                 # "via_device" : (DOMAIN, "Visonic Intruder Alarm"),
             }
@@ -134,36 +206,47 @@ class VisonicAlarmPanel(alarm.AlarmControlPanelEntity):
     #         return not self._client.isArmWithoutCode()
     #     return True
 
-    def update(self):
-        """Get the state of the device."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write availability changes, the state itself arrives via onChange."""
+        if self.available == self._was_available:
+            return
+        self._was_available = self.available
+        super()._handle_coordinator_update()
+
+    def _update_state(self, connected, status: PartitionStatus | None, changed_by):
+        """Take the HA alarm state the pushed partition status was parsed to."""
+        self._applied = (connected, status, changed_by)
         self._mystate = STATE_UNKNOWN
 
-        if self._client.connected:
-            _LOGGER.info(f"Update {self._myname}, state: {self._client.state}")
-            if self._client.state == "DISARM":
-                self._mystate = STATE_ALARM_DISARMED
-            elif self._client.state == "AWAY":
-                self._mystate = STATE_ALARM_ARMED_AWAY
-            elif self._client.state == "HOME":
-                self._mystate = STATE_ALARM_ARMED_HOME
-            else:
-                _LOGGER.info(f"Unkown alarm state: {self._client.state}")
-                self._mystate = STATE_UNKNOWN
+        if connected and status is not None:
+            _LOGGER.debug(f"Update {self._myname}, state: {status.state}")
+            self._mystate = status.alarm_state
+            if self._mystate == STATE_UNKNOWN:
+                _LOGGER.info(f"Unkown alarm state: {status.state}")
 
-        _LOGGER.info(f"Update {self._myname}, hass alarm state: {self._mystate}")
+        self._last_triggered = changed_by
+
+        # Only recomputed when the state changes, HA reads these on every write.
+        self._supported_features = self._compute_supported_features()
+        self._code_format = self._compute_code_format()
+
+        _LOGGER.debug(f"Update {self._myname}, hass alarm state: {self._mystate}")
 
     @property
     def state(self):
         """Return the state of the device."""
-        return self._mystate
+        return self._optimistic_state or self._mystate
 
     @property
     def supported_features(self) -> int:
         """Return the list of supported features."""
+        return self._supported_features
+
+    def _compute_supported_features(self) -> int:
         retval = 0  # No features, supported.
 
         if self._client.connected:
-            _LOGGER.info(f"Update {self._myname}, state: {self._client.state}")
             if self._mystate == STATE_ALARM_DISARMED:
                 retval = retval | AlarmControlPanelEntityFeature.ARM_HOME
                 retval = retval | AlarmControlPanelEntityFeature.ARM_AWAY
@@ -179,57 +262,96 @@ class VisonicAlarmPanel(alarm.AlarmControlPanelEntity):
     @property
     def code_format(self):
         """Regex for code format or None if no code is required."""
+        return self._code_format
+
+    def _compute_code_format(self):
         if self._client.connected:
-            _LOGGER.info(
+            _LOGGER.debug(
                 f"code state {self._mystate}, codeless_arm = {self._client.codeless_arm}, codeless_disarm = {self._client.codeless_disarm}"
             )
             if self._mystate == STATE_ALARM_DISARMED and self._client.codeless_arm:
-                _LOGGER.info(f"1")
                 # Alarm disarmed, allow codeless arm
                 return None
             elif (
                 self._mystate == STATE_ALARM_DISARMED and not self._client.codeless_arm
             ):
                 # Alarm disarmed, codeless arm disallowed
-                _LOGGER.info(f"2")
                 return CodeFormat.NUMBER
             elif self._mystate != STATE_ALARM_DISARMED and self._client.codeless_disarm:
                 # Alarm armed, codeless disarm allowed
-                _LOGGER.info(f"3")
                 return None
-            elif self._mystate != STATE_ALARM_DISARMED and self._client.codeless_disarm:
-                # Alarm armed, codeless disarm disallowed
-                _LOGGER.info(f"4")
-                return CodeFormat.NUMBER
             else:
-                # Safe catchall.
-                _LOGGER.info(f"5")
+                # Alarm armed, codeless disarm disallowed
                 return CodeFormat.NUMBER
         return CodeFormat.NUMBER
 
-    def alarm_disarm(self, code=None):
+    async def async_alarm_disarm(self, code=None):
         """Send disarm command."""
-        if not self._client.connected:
-            raise HomeAssistantError(
-                f"Visonic Integration {self._myname} not connected to panel."
-            )
-        self._client.client.disarm()
+        await self._async_send_command(self._client.async_disarm)
 
-    def alarm_arm_home(self, code=None):
+    async def async_alarm_arm_home(self, code=None):
         """Send arm home command."""
-        if not self._client.connected:
-            raise HomeAssistantError(
-                f"Visonic Integration {self._myname} not connected to panel."
-            )
-        self._client.client.arm_home()
+        await self._async_send_command(self._client.async_arm_home)
 
-    def alarm_arm_away(self, code=None):
+    async def async_alarm_arm_away(self, code=None):
         """Send arm away command."""
+        await self._async_send_command(self._client.async_arm_away)
+
+    async def _async_send_command(self, command):
+        """Send a command, the handler pushes it back to show it as pending."""
         if not self._client.connected:
             raise HomeAssistantError(
                 f"Visonic Integration {self._myname} not connected to panel."
             )
-        self._client.client.arm_away()
+        self._cancel_confirm()
+
+        try:
+            await command(self._client.command_partition(self.partition))
+        except VisonicApiError as err:
+            raise HomeAssistantError(
+                f"Visonic Integration {self._myname} command failed: {err}"
+            ) from err
+
+    @callback
+    def _async_command_sent(self, command):
+        """Show the command as pending and confirm it in the background."""
+        pending_state, target_state = COMMAND_STATES[command]
+        self._cancel_confirm()
+        self._optimistic_state = pending_state
+        self.async_write_ha_state()
+        # Owned by the client, so unloading the entry cancels it.
+        self._confirm_task = self._client.async_create_task(
+            self._async_confirm(target_state)
+        )
+
+    async def _async_confirm(self, target_state):
+        """Poll quickly until the panel reports the target state or time runs out."""
+        deadline = time.monotonic() + COMMAND_CONFIRM_TIMEOUT
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(COMMAND_CONFIRM_INTERVAL)
+                await self.coordinator.async_refresh()
+                if self._mystate == target_state:
+                    _LOGGER.debug(f"{self._myname} confirmed {target_state}")
+                    break
+            else:
+                _LOGGER.warning(
+                    f"{self._myname} did not reach {target_state} within "
+                    f"{COMMAND_CONFIRM_TIMEOUT}s, state is {self._mystate}"
+                )
+        finally:
+            # A newer command or removal takes over the state if it cancelled us.
+            if self._confirm_task is asyncio.current_task():
+                self._confirm_task = None
+                self._optimistic_state = None
+                self.async_write_ha_state()
+
+    def _cancel_confirm(self):
+        """Stop confirming an earlier command and drop its optimistic state."""
+        if self._confirm_task is not None:
+            task, self._confirm_task = self._confirm_task, None
+            task.cancel()
+        self._optimistic_state = None
 
     def alarm_trigger(self, code=None):
         """Send alarm trigger command."""
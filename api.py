@@ -0,0 +1,244 @@
+"""Async transport for the Visonic cloud REST API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version of the REST API spoken by this client, must be offered by the server.
+REST_VERSION = "9.0"
+APP_TYPE = "com.visonic.PowerMaxApp"
+USER_AGENT = "Visonic%20GO/2.8.62.91 CFNetwork/901.1 Darwin/17.6.0"
+REQUEST_TIMEOUT = 20
+
+# HTTP status codes returned when a user or session token is no longer valid.
+AUTH_ERROR_STATUS = (401, 403, 440)
+
+# Metrics operation name of each set_state request.
+SET_STATE_OPERATIONS = {"HOME": "arm_home", "AWAY": "arm_away", "DISARM": "disarm"}
+
+# Partition id addressing every partition on the panel.
+ALL_PARTITIONS = -1
+
+
+class VisonicApiError(Exception):
+    """Error to indicate a failed request to the Visonic cloud."""
+
+
+class VisonicAuthError(VisonicApiError):
+    """Error to indicate the user or session token was rejected."""
+
+
+class VisonicUnsupportedError(VisonicApiError):
+    """Error to indicate the server does not offer our REST version."""
+
+
+class VisonicCloudApi:
+    """Talk to the Visonic cloud REST API over a shared aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        app_id: str,
+        account: VisonicCloudApi | None = None,
+        scheme: str = "https",
+    ) -> None:
+        self.session = session
+        self.host = host
+        # Plain http is only meant for a local stand-in server.
+        self.scheme = scheme
+        self.app_id = app_id
+        # Panel clients take the user token from the account client that logged in.
+        self.account = account
+        self._user_token: str | None = None
+        self.session_token: str | None = None
+        # Number of HTTP requests sent, used to confirm the cost of a poll.
+        self.request_count = 0
+        # Optional recorder with a record(operation, seconds, error) method.
+        self.metrics = None
+        # Optional async context manager entered around every request, shared
+        # with the panel clients to bound concurrency and rate, its command()
+        # is entered around commands instead (see fleet.py).
+        self.throttle = None
+        # Commands can address a single partition.
+        self.partitioned = True
+        self.base_url = f"{scheme}://{host}/rest_api/{REST_VERSION}"
+
+    @property
+    def user_token(self) -> str | None:
+        if self.account is not None:
+            return self.account.user_token
+        return self._user_token
+
+    @user_token.setter
+    def user_token(self, value: str | None) -> None:
+        self._user_token = value
+
+    def _headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json",
+            "User-Agent": USER_AGENT,
+        }
+        if self.user_token:
+            headers["User-Token"] = self.user_token
+        if self.session_token:
+            headers["Session-Token"] = self.session_token
+        return headers
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        json: dict[str, Any] | None = None,
+        command: bool = False,
+    ) -> Any:
+        """Perform a request, record its metrics and return the decoded JSON body.
+
+        Commands skip the rate limit queue of the throttle, see fleet.py.
+        """
+        self.request_count += 1
+        if self.throttle is None:
+            return await self._timed_send(operation, method, url, json)
+        async with self.throttle.command() if command else self.throttle:
+            return await self._timed_send(operation, method, url, json)
+
+    async def _timed_send(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        json: dict[str, Any] | None = None,
+    ) -> Any:
+        start = time.monotonic()
+        try:
+            result = await self._send(method, url, json)
+        except VisonicApiError as err:
+            if self.metrics is not None:
+                self.metrics.record(operation, time.monotonic() - start, err)
+            raise
+        if self.metrics is not None:
+            self.metrics.record(operation, time.monotonic() - start)
+        return result
+
+    async def _send(
+        self, method: str, url: str, json: dict[str, Any] | None = None
+    ) -> Any:
+        try:
+            async with self.session.request(
+                method,
+                url,
+                json=json,
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as resp:
+                if resp.status in AUTH_ERROR_STATUS:
+                    raise VisonicAuthError(
+                        f"{method} {url} rejected ({resp.status}): {await resp.text()}"
+                    )
+                if resp.status >= 400:
+                    raise VisonicApiError(
+                        f"{method} {url} failed ({resp.status}): {await resp.text()}"
+                    )
+                return await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise VisonicApiError(f"{method} {url} failed: {err!r}") from err
+
+    async def async_check_version(self) -> None:
+        """Confirm the server offers the REST version we speak."""
+        data = await self._request(
+            "version", "GET", f"{self.scheme}://{self.host}/rest_api/version"
+        )
+        versions = data.get("rest_versions", []) if data else []
+        if REST_VERSION not in versions:
+            raise VisonicUnsupportedError(
+                f"REST API {REST_VERSION} not offered by {self.host} ({versions})"
+            )
+
+    async def async_authenticate(self, email: str, password: str) -> None:
+        """Log into the cloud account and keep the user token."""
+        self.user_token = None
+        self.session_token = None
+        data = await self._request(
+            "login",
+            "POST",
+            f"{self.base_url}/auth",
+            {"email": email, "password": password, "app_id": self.app_id},
+        )
+        self.user_token = data["user_token"]
+
+    def panel_api(self) -> VisonicCloudApi:
+        """Return a client for one panel that uses this client's user token."""
+        api = VisonicCloudApi(
+            self.session, self.host, self.app_id, account=self, scheme=self.scheme
+        )
+        api.throttle = self.throttle
+        return api
+
+    async def async_get_panels(self) -> list[dict[str, Any]]:
+        """Return the panels registered to the account."""
+        url = f"{self.base_url}/panels"
+        return await self._request("get_panels", "GET", url) or []
+
+    async def async_panel_login(self, panel_id: str, user_code: str) -> None:
+        """Log into a panel and keep the session token."""
+        self.session_token = None
+        data = await self._request(
+            "panel_login",
+            "POST",
+            f"{self.base_url}/panel/login",
+            {
+                "user_code": user_code,
+                "app_type": APP_TYPE,
+                "app_id": self.app_id,
+                "panel_serial": panel_id,
+            },
+        )
+        self.session_token = data["session_token"]
+
+    async def async_get_panel_info(self) -> dict[str, Any]:
+        """Return the manufacturer/model details of the logged in panel."""
+        url = f"{self.base_url}/panel_info"
+        return await self._request("get_panel_info", "GET", url)
+
+    async def async_get_status(self) -> dict[str, Any]:
+        """Return the panel status, connectivity and partitions in one request."""
+        return await self._request("get_status", "GET", f"{self.base_url}/status")
+
+    async def async_get_devices(self) -> list[dict[str, Any]]:
+        """Return every enrolled device (zones, keyfobs, sirens...) in one request."""
+        url = f"{self.base_url}/devices"
+        return await self._request("get_devices", "GET", url) or []
+
+    async def async_get_events(self) -> list[dict[str, Any]]:
+        """Return the recent entries of the panel event log."""
+        url = f"{self.base_url}/events"
+        return await self._request("get_events", "GET", url) or []
+
+    async def async_set_state(
+        self, state: str, partition: int = ALL_PARTITIONS
+    ) -> dict[str, Any]:
+        """Request a new arm state for a partition."""
+        return await self._request(
+            SET_STATE_OPERATIONS.get(state, "set_state"),
+            "POST",
+            f"{self.base_url}/set_state",
+            {"partition": partition, "state": state},
+            command=True,
+        )
+
+    async def async_arm_home(self, partition: int = ALL_PARTITIONS):
+        return await self.async_set_state("HOME", partition)
+
+    async def async_arm_away(self, partition: int = ALL_PARTITIONS):
+        return await self.async_set_state("AWAY", partition)
+
+    async def async_disarm(self, partition: int = ALL_PARTITIONS):
+        return await self.async_set_state("DISARM", partition)
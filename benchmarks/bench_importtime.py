@@ -0,0 +1,125 @@
+"""Import-time benchmark of the integration, from `python -X importtime`.
+
+Imports the modules Home Assistant has loaded anyway by the time it sets up
+an integration, then the integration and each of its platforms, in a fresh
+interpreter per run. Only the modules imported after that baseline are
+counted, so the figures are what the integration adds to startup:
+
+* total: cumulative import time of the integration module
+* own: self time of the integration's own modules
+* deps: self time of everything else it pulled in, slowest listed first
+
+Needs Home Assistant installed, the repo is imported as
+custom_components.visonic_cloud from a temporary directory.
+
+    python benchmarks/bench_importtime.py --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PACKAGE = "custom_components.visonic_cloud"
+MODULES = (
+    "",
+    ".config_flow",
+    ".alarm_control_panel",
+    ".binary_sensor",
+    ".sensor",
+    ".diagnostics",
+)
+# Already imported by Home Assistant before any integration is set up.
+BASELINE = (
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.alarm_control_panel",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.sensor",
+)
+MARKER = "-- visonic_cloud --"
+
+
+def run_once(path: Path, module: str) -> list[tuple[str, int, int]]:
+    """Return (module, self us, cumulative us) imported after the baseline."""
+    code = (
+        "import sys\n"
+        + "".join(f"import {name}\n" for name in BASELINE)
+        + f"sys.stderr.write({MARKER!r} + '\\n')\n"
+        + f"import {module}\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=path,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def bench(path: Path, module: str, runs: int) -> dict[str, object]:
+    totals, own, deps = [], [], []
+    slowest: dict[str, list[int]] = {}
+    for _ in range(runs):
+        imports = run_once(path, module)
+        totals.append(next(c for name, _, c in imports if name == module))
+        own.append(sum(s for name, s, _ in imports if name.startswith(PACKAGE)))
+        deps.append(sum(s for name, s, _ in imports if not name.startswith(PACKAGE)))
+        for name, self_us, _ in imports:
+            if not name.startswith(PACKAGE):
+                slowest.setdefault(name, []).append(self_us)
+    return {
+        "total_ms": statistics.median(totals) / 1000,
+        "own_ms": statistics.median(own) / 1000,
+        "deps_ms": statistics.median(deps) / 1000,
+        "slowest": sorted(
+            ((statistics.median(v) / 1000, k) for k, v in slowest.items()),
+            reverse=True,
+        )[:5],
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    repo = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "custom_components").mkdir()
+        (root / "custom_components" / "__init__.py").touch()
+        (root / "custom_components" / "visonic_cloud").symlink_to(repo)
+
+        print(f"{'module':<40} {'total_ms':>9} {'own_ms':>9} {'deps_ms':>9}")
+        for suffix in args.modules:
+            module = f"{PACKAGE}{suffix}"
+            result = bench(root, module, args.runs)
+            print(
+                f"{module:<40} {result['total_ms']:>9.1f} "
+                f"{result['own_ms']:>9.1f} {result['deps_ms']:>9.1f}"
+            )
+            if args.verbose:
+                for ms, name in result["slowest"]:
+                    print(f"    {name:<36} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("-v", "--verbose", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,223 @@
+"""End-to-end latency benchmark of the integration against the mock Visonic cloud.
+
+Sets up one config entry per simulated panel, all on one account, in a test
+Home Assistant instance for 1, 10 and 100 panels. Every figure goes through
+the VisonicHandler and its coordinator, the request throttle, retries and
+event log fetches:
+
+* validate_s: config_flow.validate_input for one panel, as the flow runs it
+* setup_s: from setting up the entries until every alarm panel exists
+* poll_p50_ms/poll_p95_ms: one coordinator refresh per entry, all at once
+* command_p50_ms/command_p95_ms: arm away service call until the entity
+  reports armed away, confirmation polls and exit delay included
+* requests_per_min: requests the mock server received while the entries
+  polled on their own schedule, over --duration seconds of wall-clock time
+
+Needs Home Assistant and pytest-homeassistant-custom-component installed:
+
+    python benchmarks/bench_latency.py --latency 0.05 --duration 60
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import importlib
+from pathlib import Path
+import sys
+import tempfile
+import time
+import uuid
+
+# The loader can only be imported once the core is.
+import homeassistant.core  # noqa: F401
+from homeassistant import loader
+from homeassistant.const import STATE_ALARM_ARMED_AWAY
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from mock_server import MockConfig, MockVisonicCloud
+
+DOMAIN = "visonic_cloud"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def bench(
+    panels: int, args: argparse.Namespace, config_dir: str
+) -> dict[str, float]:
+    server = MockVisonicCloud(
+        MockConfig(
+            panels=panels,
+            latency=args.latency,
+            jitter=args.jitter,
+            exit_delay=args.exit_delay,
+        )
+    )
+    await server.start()
+    async with async_test_home_assistant() as hass:
+        # Older harness versions take no config dir argument, and register
+        # their own custom_components package.
+        hass.config.config_dir = config_dir
+        sys.modules.pop("custom_components", None)
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        integration = await loader.async_get_integration(hass, DOMAIN)
+        component = integration.get_component()
+        config_flow = importlib.import_module(f"{integration.pkg_path}.config_flow")
+        # The mock server speaks plain http.
+        http_api = functools.partial(
+            component.account.VisonicCloudApi, scheme="http"
+        )
+        component.account.VisonicCloudApi = http_api
+        config_flow.VisonicCloudApi = http_api
+
+        account = {
+            "host": server.host,
+            "email": "bench@example.com",
+            "password": "secret",
+            "master_code": "1234",
+            "codeless_arm": True,
+            "codeless_disarm": True,
+            "update_interval": args.update_interval,
+            "min_update_interval": args.min_update_interval,
+            "rate_limit": args.rate_limit,
+        }
+        serials = list(server.panels)
+
+        # The checks the config flow runs before creating an entry.
+        start = time.perf_counter()
+        await config_flow.validate_input(
+            hass, {**account, "panel_id": serials[0], "uuid": str(uuid.uuid4())}
+        )
+        validate = time.perf_counter() - start
+
+        # Setup: the entries share the account login, each logs into its panel.
+        entries = [
+            MockConfigEntry(
+                domain=DOMAIN,
+                unique_id=serial,
+                data={**account, "panel_id": serial, "uuid": str(uuid.uuid4())},
+            )
+            for serial in serials
+        ]
+        for entry in entries:
+            entry.add_to_hass(hass)
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+        )
+        while len(hass.states.async_entity_ids("alarm_control_panel")) < panels:
+            await asyncio.sleep(0.01)
+        setup = time.perf_counter() - start
+        await hass.async_block_till_done()
+
+        # Poll latency: a refresh of every entry at once.
+        coordinators = [
+            hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries
+        ]
+
+        async def poll(coordinator):
+            begin = time.perf_counter()
+            await coordinator.async_refresh()
+            return time.perf_counter() - begin
+
+        poll_samples = []
+        requests_before = server.request_count
+        for _ in range(args.rounds):
+            poll_samples += await asyncio.gather(*map(poll, coordinators))
+        requests_per_poll = (server.request_count - requests_before) / (
+            args.rounds * panels
+        )
+
+        # Command to state: arm away until the entity shows it confirmed.
+        registry = er.async_get(hass)
+        entity_ids = [
+            item.entity_id
+            for entry in entries
+            for item in er.async_entries_for_config_entry(registry, entry.entry_id)
+            if item.domain == "alarm_control_panel"
+        ]
+
+        async def command(entity_id):
+            begin = time.perf_counter()
+            await hass.services.async_call(
+                "alarm_control_panel",
+                "alarm_arm_away",
+                {"entity_id": entity_id},
+                blocking=True,
+            )
+            while hass.states.get(entity_id).state != STATE_ALARM_ARMED_AWAY:
+                await asyncio.sleep(0.01)
+            return time.perf_counter() - begin
+
+        command_samples = await asyncio.gather(*map(command, entity_ids))
+
+        # Request rate: what the server saw while the entries ran on their own.
+        requests_before = server.request_count
+        start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        elapsed = time.perf_counter() - start
+        requests_per_min = (server.request_count - requests_before) / elapsed * 60
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+    await server.stop()
+    return {
+        "panels": panels,
+        "validate_s": validate,
+        "setup_s": setup,
+        "poll_p50_ms": percentile(poll_samples, 50) * 1000,
+        "poll_p95_ms": percentile(poll_samples, 95) * 1000,
+        "command_p50_ms": percentile(command_samples, 50) * 1000,
+        "command_p95_ms": percentile(command_samples, 95) * 1000,
+        "requests_per_poll": requests_per_poll,
+        "requests_per_min": requests_per_min,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    columns = (
+        "panels",
+        "validate_s",
+        "setup_s",
+        "poll_p50_ms",
+        "poll_p95_ms",
+        "command_p50_ms",
+        "command_p95_ms",
+        "requests_per_poll",
+        "requests_per_min",
+    )
+    print(" ".join(f"{column:>17}" for column in columns))
+    with tempfile.TemporaryDirectory() as config_dir:
+        components = Path(config_dir) / "custom_components"
+        components.mkdir()
+        (components / "__init__.py").touch()
+        (components / DOMAIN).symlink_to(Path(__file__).resolve().parent.parent)
+        # The runs share it, the integration is only imported once.
+        sys.path.insert(0, config_dir)
+        for panels in args.panels:
+            result = await bench(panels, args, config_dir)
+            print(" ".join(f"{result[column]:>17.2f}" for column in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--panels", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--exit-delay", type=float, default=0.0)
+    # Wall-clock seconds the server counts requests for, after the commands.
+    parser.add_argument("--duration", type=float, default=60)
+    # Entry settings, the rate limit is requests per minute for the account.
+    parser.add_argument("--update-interval", type=int, default=60)
+    parser.add_argument("--min-update-interval", type=int, default=5)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
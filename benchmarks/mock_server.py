@@ -0,0 +1,274 @@
+"""Local stand-in for the Visonic cloud REST API.
+
+Emulates the endpoints used by api.VisonicCloudApi (version, auth, panels,
+panel login, panel info, status, set_state, devices and events) for any
+number of simulated panels, with configurable latency, errors and token
+expiry. Run it standalone or start it from a benchmark:
+
+    python benchmarks/mock_server.py --panels 10 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import itertools
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+REST_VERSION = "9.0"
+ZONES_PER_PANEL = 8
+# Entries kept in each panel's event log, the cloud only returns the latest.
+EVENT_LOG_SIZE = 100
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the stand-in server."""
+
+    panels: int = 1
+    partitions: int = 1
+    # Seconds added to every response, plus up to `jitter` more at random.
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of requests answered with a 500.
+    error_rate: float = 0.0
+    # Seconds a session token stays valid, 0 for never.
+    token_ttl: float = 0.0
+    # Seconds a partition spends arming before it reports the new state.
+    exit_delay: float = 0.0
+
+
+@dataclass
+class MockPanel:
+    serial: str
+    partitions: dict[int, str]
+    # partition -> (state, monotonic time it takes effect)
+    pending: dict[int, tuple[str, float]] = field(default_factory=dict)
+    events: deque[dict] = field(
+        default_factory=lambda: deque(maxlen=EVENT_LOG_SIZE)
+    )
+
+
+class MockVisonicCloud:
+    """State and request handlers of the stand-in server."""
+
+    def __init__(self, config: MockConfig | None = None) -> None:
+        self.config = config or MockConfig()
+        partitions = range(1, self.config.partitions + 1)
+        self.panels = {
+            f"P{index:05d}": MockPanel(
+                f"P{index:05d}", {partition: "DISARM" for partition in partitions}
+            )
+            for index in range(self.config.panels)
+        }
+        self.user_tokens: set[str] = set()
+        # session token -> (panel serial, issued at)
+        self.sessions: dict[str, tuple[str, float]] = {}
+        self.request_count = 0
+        self.requests_by_path: dict[str, int] = {}
+        self._event_ids = itertools.count(1)
+        self.runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        base = f"/rest_api/{REST_VERSION}"
+        app.router.add_get("/rest_api/version", self.version)
+        app.router.add_post(f"{base}/auth", self.auth)
+        app.router.add_get(f"{base}/panels", self.get_panels)
+        app.router.add_post(f"{base}/panel/login", self.panel_login)
+        app.router.add_get(f"{base}/panel_info", self.panel_info)
+        app.router.add_get(f"{base}/status", self.status)
+        app.router.add_post(f"{base}/set_state", self.set_state)
+        app.router.add_get(f"{base}/devices", self.devices)
+        app.router.add_get(f"{base}/events", self.get_events)
+        return app
+
+    async def start(self, port: int = 0) -> None:
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.request_count += 1
+        path = request.path.rsplit(REST_VERSION, 1)[-1]
+        self.requests_by_path[path] = self.requests_by_path.get(path, 0) + 1
+        config = self.config
+        if config.latency or config.jitter:
+            await asyncio.sleep(config.latency + random.uniform(0, config.jitter))
+        if config.error_rate and random.random() < config.error_rate:
+            return web.json_response({"error": "simulated failure"}, status=500)
+        return await handler(request)
+
+    def _user(self, request: web.Request) -> None:
+        if request.headers.get("User-Token") not in self.user_tokens:
+            raise web.HTTPUnauthorized(text='{"error_reason_code": "BadUserToken"}')
+
+    def _panel(self, request: web.Request) -> MockPanel:
+        self._user(request)
+        session = self.sessions.get(request.headers.get("Session-Token", ""))
+        if session is None or (
+            self.config.token_ttl
+            and time.monotonic() - session[1] > self.config.token_ttl
+        ):
+            raise web.HTTPUnauthorized(text='{"error_reason_code": "BadSessionToken"}')
+        panel = self.panels[session[0]]
+        self._settle(panel)
+        return panel
+
+    def _settle(self, panel: MockPanel) -> None:
+        """Apply pending state changes whose exit delay has passed."""
+        now = time.monotonic()
+        for partition, (state, due) in list(panel.pending.items()):
+            if now >= due:
+                panel.partitions[partition] = state
+                del panel.pending[partition]
+
+    async def version(self, request: web.Request) -> web.Response:
+        return web.json_response({"rest_versions": ["8.0", REST_VERSION]})
+
+    async def auth(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("email") or not body.get("password"):
+            raise web.HTTPUnauthorized()
+        token = uuid.uuid4().hex
+        self.user_tokens.add(token)
+        return web.json_response({"user_token": token})
+
+    async def get_panels(self, request: web.Request) -> web.Response:
+        self._user(request)
+        return web.json_response(
+            [{"panel_serial": serial, "alias": serial} for serial in self.panels]
+        )
+
+    async def panel_login(self, request: web.Request) -> web.Response:
+        self._user(request)
+        body = await request.json()
+        if body.get("panel_serial") not in self.panels:
+            raise web.HTTPNotFound()
+        token = uuid.uuid4().hex
+        self.sessions[token] = (body["panel_serial"], time.monotonic())
+        return web.json_response({"session_token": token})
+
+    async def panel_info(self, request: web.Request) -> web.Response:
+        panel = self._panel(request)
+        return web.json_response(
+            {
+                "manufacturer": "Visonic",
+                "model": "PowerMaster 10",
+                "serial": panel.serial,
+            }
+        )
+
+    async def status(self, request: web.Request) -> web.Response:
+        panel = self._panel(request)
+        return web.json_response(
+            {
+                "connected": True,
+                "partitions": [
+                    {
+                        "id": partition,
+                        "state": state,
+                        "status": "EXIT" if partition in panel.pending else "",
+                    }
+                    for partition, state in panel.partitions.items()
+                ],
+            }
+        )
+
+    async def set_state(self, request: web.Request) -> web.Response:
+        panel = self._panel(request)
+        body = await request.json()
+        partitions = (
+            list(panel.partitions)
+            if body["partition"] == -1
+            else [body["partition"]]
+        )
+        due = time.monotonic() + (
+            self.config.exit_delay if body["state"] != "DISARM" else 0
+        )
+        for partition in partitions:
+            panel.pending[partition] = (body["state"], due)
+            panel.events.append(
+                {
+                    "event": next(self._event_ids),
+                    "label": body["state"] if body["state"] == "DISARM" else "ARM",
+                    "description": body["state"],
+                    "appointment": "User 1",
+                    "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "partitions": [partition],
+                }
+            )
+        self._settle(panel)
+        return web.json_response({"process_token": uuid.uuid4().hex})
+
+    async def devices(self, request: web.Request) -> web.Response:
+        self._panel(request)
+        return web.json_response(
+            [
+                {
+                    "id": zone,
+                    "device_type": "ZONE",
+                    "subtype": "CONTACT",
+                    "zone_type": "DELAY_1",
+                    "name": f"Zone {zone}",
+                    "location": f"Room {zone}",
+                    "warnings": [],
+                    "partitions": [1],
+                }
+                for zone in range(1, ZONES_PER_PANEL + 1)
+            ]
+        )
+
+    async def get_events(self, request: web.Request) -> web.Response:
+        panel = self._panel(request)
+        return web.json_response(list(panel.events))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    server = MockVisonicCloud(
+        MockConfig(
+            panels=args.panels,
+            partitions=args.partitions,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            token_ttl=args.token_ttl,
+            exit_delay=args.exit_delay,
+        )
+    )
+    await server.start(args.port)
+    print(f"Mock Visonic cloud on http://{server.host} panels={list(server.panels)}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--panels", type=int, default=1)
+    parser.add_argument("--partitions", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=0.0)
+    parser.add_argument("--exit-delay", type=float, default=0.0)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
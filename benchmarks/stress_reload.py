@@ -0,0 +1,195 @@
+"""Reload stress test: setup, poll, command and reload an entry many times.
+
+Runs the integration in a test Home Assistant instance against the mock
+Visonic cloud. Each cycle sends an arm or disarm command and reloads the
+entry straight away, while the command's confirmation is still running.
+After a warm-up, it checks that these stay flat:
+
+* traced Python memory (tracemalloc), as average growth per cycle
+* live instances of the integration's own classes
+* open sockets of the process
+* asyncio tasks and threads
+
+Exits non-zero if any grows beyond its allowance. Needs Home Assistant and
+pytest-homeassistant-custom-component installed:
+
+    python benchmarks/stress_reload.py --cycles 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import gc
+import os
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import tracemalloc
+import uuid
+
+# The loader can only be imported once the core is.
+import homeassistant.core  # noqa: F401
+from homeassistant import loader
+from homeassistant.helpers.entity_platform import DATA_ENTITY_PLATFORM
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from mock_server import MockConfig, MockVisonicCloud
+
+DOMAIN = "visonic_cloud"
+
+
+def open_sockets() -> int:
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            # The descriptor used to list the directory is already closed.
+            pass
+    return count
+
+
+def integration_objects() -> int:
+    """Return the live instances of classes defined by the integration."""
+    package = f"custom_components.{DOMAIN}"
+    return sum(
+        str(getattr(type(obj), "__module__", "")).startswith(package)
+        for obj in gc.get_objects()
+    )
+
+
+def sample() -> dict[str, float]:
+    gc.collect()
+    return {
+        "memory_kib": tracemalloc.get_traced_memory()[0] / 1024,
+        "objects": integration_objects(),
+        "sockets": open_sockets(),
+        "tasks": len(asyncio.all_tasks()),
+        "threads": threading.active_count(),
+    }
+
+
+def prune_entity_platforms(hass) -> None:
+    """Drop the emptied entity platforms some Home Assistant versions keep.
+
+    On 2024.3 for one, unloading an entry resets its entity platforms but
+    leaves them registered, which would show up here as growth on every reload.
+    """
+    platforms = hass.data.get(DATA_ENTITY_PLATFORM, {}).get(DOMAIN, [])
+    platforms[:] = [platform for platform in platforms if platform.entities]
+
+
+async def stress(args: argparse.Namespace) -> bool:
+    server = MockVisonicCloud(MockConfig(latency=args.latency))
+    await server.start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        components = Path(config_dir) / "custom_components"
+        components.mkdir()
+        (components / "__init__.py").touch()
+        (components / DOMAIN).symlink_to(Path(__file__).resolve().parent.parent)
+        sys.path.insert(0, config_dir)
+
+        async with async_test_home_assistant() as hass:
+            # Older harness versions take no config dir argument, and register
+            # their own custom_components package.
+            hass.config.config_dir = config_dir
+            sys.modules.pop("custom_components", None)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            integration = await loader.async_get_integration(hass, DOMAIN)
+            account = integration.get_component().account
+            # The mock server speaks plain http.
+            account.VisonicCloudApi = functools.partial(
+                account.VisonicCloudApi, scheme="http"
+            )
+
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    "host": server.host,
+                    "email": "stress@example.com",
+                    "password": "secret",
+                    "panel_id": next(iter(server.panels)),
+                    "master_code": "1234",
+                    "codeless_arm": True,
+                    "codeless_disarm": True,
+                    "update_interval": 60,
+                    "min_update_interval": 5,
+                    "rate_limit": 0,
+                    "uuid": str(uuid.uuid4()),
+                },
+            )
+            entry.add_to_hass(hass)
+            await hass.config_entries.async_setup(entry.entry_id)
+            while not hass.states.async_entity_ids("alarm_control_panel"):
+                await asyncio.sleep(0.1)
+            await hass.async_block_till_done()
+
+            tracemalloc.start()
+            baseline = None
+            print(
+                f"{'cycle':>6} {'memory_kib':>11} {'objects':>8} {'sockets':>8} "
+                f"{'tasks':>6} {'threads':>8}"
+            )
+            for cycle in range(1, args.cycles + 1):
+                entity_id = hass.states.async_entity_ids("alarm_control_panel")[0]
+                service = "alarm_arm_away" if cycle % 2 else "alarm_disarm"
+                await hass.services.async_call(
+                    "alarm_control_panel",
+                    service,
+                    {"entity_id": entity_id},
+                    blocking=True,
+                )
+                await hass.config_entries.async_reload(entry.entry_id)
+                await hass.async_block_till_done()
+                prune_entity_platforms(hass)
+
+                if cycle == args.warmup:
+                    baseline = sample()
+                if cycle % args.report == 0 or cycle == args.cycles:
+                    current = sample()
+                    print(
+                        f"{cycle:>6} {current['memory_kib']:>11.1f} "
+                        f"{current['objects']:>8} {current['sockets']:>8} "
+                        f"{current['tasks']:>6} {current['threads']:>8}"
+                    )
+
+            final = sample()
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+    await server.stop()
+
+    measured = args.cycles - args.warmup
+    growth = {key: final[key] - baseline[key] for key in final}
+    failures = []
+    if growth["memory_kib"] / measured > args.max_memory_per_cycle:
+        failures.append(
+            f"memory grew {growth['memory_kib']:.1f} KiB over {measured} cycles"
+        )
+    for key in ("objects", "sockets", "tasks", "threads"):
+        if growth[key] > args.slack:
+            failures.append(f"{key} grew by {growth[key]}")
+    for failure in failures:
+        print(f"LEAK: {failure}")
+    print(f"requests served: {server.request_count}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--report", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    # Allowed growth: KiB of memory per cycle, and objects/sockets/tasks/threads
+    # (keep-alive connections and the executor pool vary a little).
+    parser.add_argument("--max-memory-per-cycle", type=float, default=1.0)
+    parser.add_argument("--slack", type=int, default=2)
+    args = parser.parse_args()
+    if args.warmup >= args.cycles:
+        parser.error("--warmup must be less than --cycles")
+    sys.exit(0 if asyncio.run(stress(args)) else 1)
@@ -0,0 +1,71 @@
+"""Zone binary sensors for the Visonic Alarm integration."""
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import WARNING_LOW_BATTERY, WARNING_OPEN, WARNING_TAMPER
+from .entity import VisonicDeviceEntity, async_setup_device_entities
+from .status import ZoneStatus
+
+# key, device class, entity category, warning types that turn the sensor on
+ZONE_SENSORS = (
+    ("open", BinarySensorDeviceClass.OPENING, None, WARNING_OPEN),
+    (
+        "tamper",
+        BinarySensorDeviceClass.TAMPER,
+        EntityCategory.DIAGNOSTIC,
+        WARNING_TAMPER,
+    ),
+    (
+        "battery",
+        BinarySensorDeviceClass.BATTERY,
+        EntityCategory.DIAGNOSTIC,
+        WARNING_LOW_BATTERY,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the zone binary sensors."""
+
+    def create_entities(coordinator, device):
+        if device.device_type != "ZONE":
+            return []
+        return [
+            VisonicZoneBinarySensor(coordinator, device, *description)
+            for description in ZONE_SENSORS
+        ]
+
+    async_setup_device_entities(hass, entry, async_add_entities, create_entities)
+
+
+class VisonicZoneBinarySensor(VisonicDeviceEntity, BinarySensorEntity):
+    """Open, tamper or low battery state of a zone."""
+
+    def __init__(
+        self,
+        coordinator,
+        device: ZoneStatus,
+        key: str,
+        device_class: BinarySensorDeviceClass,
+        entity_category: EntityCategory | None,
+        warning_types: tuple[str, ...],
+    ) -> None:
+        self._warning_types = warning_types
+        self._attr_device_class = device_class
+        self._attr_entity_category = entity_category
+        super().__init__(coordinator, device, key)
+
+    def _update_value(self, device: ZoneStatus) -> None:
+        self._attr_is_on = any(
+            warning in self._warning_types for warning in self.warnings
+        )
@@ -1,63 +1,373 @@
-from homeassistant.core import callback
-from visonic import alarm
+import asyncio
+import importlib
+import inspect
 import logging
+import time
 
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from datetime import timedelta
+from .account import async_get_account
+from .api import ALL_PARTITIONS, VisonicApiError, VisonicAuthError
+from .events import VisonicEventLog
+from .metrics import ApiMetrics
+from .const import (
+    CONNECTION_KEYS,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_RATE_LIMIT,
+    EVENTS_INTERVAL,
+    FAST_POLL_WINDOW,
+    LOGIN_RETRY_MAX_DELAY,
+    POLL_BACKOFF_FACTOR,
+    RETRY_ATTEMPTS,
+)
+from .resilience import CircuitBreaker, backoff_delay
+from .status import PanelStatus, PartitionStatus, ZoneStatus
 
 _LOGGER = logging.getLogger(__name__)
 
+# API client method sending each command.
+COMMAND_METHODS = {
+    "HOME": "async_arm_home",
+    "AWAY": "async_arm_away",
+    "DISARM": "async_disarm",
+}
+
+
+async def async_import_library(hass):
+    """Import the visonicalarm library, only the fallback transport needs it.
+
+    The import runs in the executor so it doesn't block the event loop.
+    """
+    return await hass.async_add_executor_job(importlib.import_module, "visonic.alarm")
+
+
+class VisonicLibraryApi:
+    """Fallback transport running the blocking visonicalarm library in executor threads.
+
+    Mirrors the VisonicCloudApi interface and returns the same dict shapes.
+    """
+
+    def __init__(self, hass, host, app_id) -> None:
+        self.hass = hass
+        self.host = host
+        self.app_id = app_id
+        self.client = None
+        self.request_count = 0
+        self.metrics = None
+        self.throttle = None
+        # Older library versions arm and disarm every partition at once.
+        self.partitioned = False
+
+    async def _async_call(self, func, *args, command=False):
+        self.request_count += 1
+        if self.throttle is None:
+            return await self._async_timed_call(func, *args)
+        async with self.throttle.command() if command else self.throttle:
+            return await self._async_timed_call(func, *args)
+
+    async def _async_timed_call(self, func, *args):
+        start = time.monotonic()
+        try:
+            result = await self.hass.async_add_executor_job(func, *args)
+        except Exception as err:
+            # The library has no error hierarchy, treat everything as transient.
+            error = VisonicApiError(f"{func.__name__} failed: {err}")
+            if self.metrics is not None:
+                self.metrics.record(func.__name__, time.monotonic() - start, error)
+            raise error from err
+        if self.metrics is not None:
+            self.metrics.record(func.__name__, time.monotonic() - start)
+        return result
+
+    async def async_close(self):
+        """Drop the library client, closing its HTTP session if it exposes one."""
+        client, self.client = self.client, None
+        if (close := getattr(client, "close", None)) is not None:
+            await self.hass.async_add_executor_job(close)
+
+    async def async_check_version(self):
+        alarm = await async_import_library(self.hass)
+        self.client = await self._async_call(alarm.Setup, self.host, self.app_id)
+        try:
+            params = inspect.signature(self.client.arm_home).parameters
+        except (TypeError, ValueError):
+            params = {}
+        self.partitioned = "partition" in params
+
+    async def async_authenticate(self, email, password):
+        await self._async_call(self.client.authenticate, email, password)
+
+    async def async_get_panels(self):
+        panels = await self._async_call(self.client.get_panels)
+        return [{"panel_serial": panel.panel_serial} for panel in panels or []]
+
+    async def async_panel_login(self, panel_id, user_code):
+        await self._async_call(self.client.panel_login, panel_id, user_code)
+
+    async def async_get_panel_info(self):
+        info = await self._async_call(self.client.get_panel_info)
+        return {"manufacturer": info.manufacturer, "model": info.model}
+
+    async def async_get_status(self):
+        # The library has no combined call, so this still costs two requests.
+        if not await self._async_call(self.client.connected):
+            return {"connected": False, "partitions": []}
+        status = await self._async_call(self.client.get_status)
+        return {
+            "connected": True,
+            "partitions": [
+                {
+                    "id": getattr(partition, "id", ALL_PARTITIONS),
+                    "state": partition.state,
+                }
+                for partition in status.partitions
+            ],
+        }
+
+    async def async_get_devices(self):
+        devices = await self._async_call(self.client.get_devices)
+        return [
+            {
+                "id": device.id,
+                "name": getattr(device, "name", None),
+                "location": getattr(device, "location", None),
+                "device_type": getattr(device, "device_type", None),
+                "subtype": getattr(device, "subtype", None),
+                "zone_type": getattr(device, "zone_type", None),
+                "warnings": getattr(device, "warnings", None) or [],
+            }
+            for device in devices or []
+        ]
+
+    async def async_get_events(self):
+        events = await self._async_call(self.client.get_events)
+        return [
+            {
+                "event": getattr(event, "event_id", None),
+                "label": getattr(event, "label", None),
+                "description": getattr(event, "description", None),
+                "appointment": getattr(event, "appointment", None),
+                "datetime": str(getattr(event, "datetime", "")),
+                "partitions": getattr(event, "partitions", None),
+            }
+            for event in events or []
+        ]
+
+    async def async_arm_home(self, partition=ALL_PARTITIONS):
+        await self._async_command(self.client.arm_home, partition)
+
+    async def async_arm_away(self, partition=ALL_PARTITIONS):
+        await self._async_command(self.client.arm_away, partition)
+
+    async def async_disarm(self, partition=ALL_PARTITIONS):
+        await self._async_command(self.client.disarm, partition)
+
+    async def _async_command(self, func, partition):
+        if partition == ALL_PARTITIONS:
+            await self._async_call(func, command=True)
+        elif self.partitioned:
+            await self._async_call(func, partition, command=True)
+        else:
+            # Never widen a command to partitions it wasn't meant for.
+            raise VisonicApiError(f"Library cannot address partition {partition}")
+
+
+class PollScheduler:
+    """Adaptive poll interval.
+
+    Polls at the minimum interval after a command or while the panel is in a
+    volatile state, then backs off towards the maximum while it stays stable.
+    """
+
+    def __init__(self, min_interval: int, max_interval: int) -> None:
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.interval = self.min_interval
+        self._fast_until = 0.0
+
+    def boost(self) -> None:
+        """Poll fast for a while, a command has just been sent."""
+        self.interval = self.min_interval
+        self._fast_until = time.monotonic() + FAST_POLL_WINDOW
+
+    def next_interval(self, volatile: bool) -> int:
+        """Return the interval to wait before the next poll."""
+        if volatile or time.monotonic() < self._fast_until:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(
+                self.max_interval, self.interval * POLL_BACKOFF_FACTOR
+            )
+        return self.interval
+
+    def configure(self, min_interval: int, max_interval: int) -> None:
+        """Change the bounds, keeping the current interval within them."""
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.interval = min(
+            self.max_interval, max(self.min_interval, self.interval)
+        )
+
 
 class VisonicHandler:
-    def __init__(self, hass, config_entry, panel_id) -> None:
+    def __init__(self, hass, config_entry, panel_id, store=None) -> None:
         self.hass = hass
+        self.store = store
         self.brand = ""
         self.model = ""
         self.entry = config_entry
         self.connected = False
-        self.panel_status = None
+        # Last status snapshot, partitions in the order the panel lists them.
+        self.status = PanelStatus()
         self.panel_info = None
-        self.state = None
-        self.client = None
+        self.api = None
+        self.account = None
+        # HTTP requests made by the last poll: status, devices, and events when due.
+        self.poll_request_count = 0
+        # The event log is fetched on a change, on the poll after it (the cloud
+        # may log the event late) and every EVENTS_INTERVAL seconds.
+        self._events_pending = False
+        self._events_due = 0.0
         self.panel_id = panel_id
+        # Entities of this panel listen on this signal for status and commands.
+        self.signal = f"VISONIC_{panel_id}"
         self.code = ""
         self.codeless_arm = True
         self.codeless_disarm = False
+        # Tasks started for this entry, cancelled when it unloads.
+        self._tasks = set()
+        # Commands run one at a time, pending ones by (state, partition).
+        self._command_lock = asyncio.Lock()
+        self._commands = {}
+        # State of each partition a command was sent for since the last status.
+        self._expected = {}
+        self.scheduler = PollScheduler(
+            config_entry.data.get(
+                "min_update_interval", DEFAULT_MIN_UPDATE_INTERVAL
+            ),
+            config_entry.data["update_interval"],
+        )
+        # Login settings in use, a change to any of them needs a new login.
+        self.connection = {key: config_entry.data[key] for key in CONNECTION_KEYS}
+        self.breaker = CircuitBreaker()
+        # Set once the cloud rejected the password or master code, no request is
+        # sent until the reauth flow reloads the entry with new credentials.
+        self.login_rejected = False
+        self.metrics = ApiMetrics()
+        # VisonicProfiler tracing this handler, None when not profiling.
+        self.profiler = None
+        self.events = VisonicEventLog(hass, config_entry.entry_id, panel_id, store)
+
+    @callback
+    def async_create_task(self, target):
+        """Start a task owned by this handler, it is cancelled on unload."""
+        task = self.hass.async_create_task(target)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def async_close(self):
+        """Cancel the tasks of this handler and release its sessions."""
+        if self.profiler is not None:
+            self.profiler.async_stop()
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._commands.clear()
+        if isinstance(self.api, VisonicLibraryApi):
+            await self.api.async_close()
+        self.api = None
+        self.connected = False
+        if self.store is not None:
+            await self.store.async_flush()
+        _LOGGER.debug(f"Closed {self.panel_id}, cancelled {len(tasks)} tasks")
 
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
         return f"{self.brand} {self.model} ({self.panel_id})"
 
+    @property
+    def partitions(self) -> dict[int, PartitionStatus]:
+        """Return the partitions by id."""
+        return self.status.partitions_by_id
+
+    @property
+    def devices(self) -> dict[int, ZoneStatus]:
+        """Return the devices (zones, keyfobs, sirens...) by id."""
+        return self.status.zones_by_id
+
+    @property
+    def primary_partition(self):
+        """Return the id of the first partition, it keeps the panel's unique id."""
+        return next(iter(self.partitions), ALL_PARTITIONS)
+
+    @property
+    def partitioned(self):
+        """Return True if commands can address each partition on its own."""
+        return len(self.partitions) > 1 and (self.api is None or self.api.partitioned)
+
+    def command_partition(self, partition):
+        """Return the partition to address, all of them on unpartitioned panels."""
+        return partition if self.partitioned else ALL_PARTITIONS
+
+    @property
+    def request_count(self) -> int:
+        """Return the number of HTTP requests made by this entry."""
+        return self.api.request_count if self.api is not None else 0
+
     async def async_login(self):
-        self.client = await self.hass.async_add_executor_job(
-            alarm.Setup, self.entry.data["host"], self.entry.data["uuid"]
-        )
+        start = time.monotonic()
+        try:
+            await self._async_login()
+        except Exception as err:
+            self.metrics.record("login", time.monotonic() - start, err)
+            raise
+        self.metrics.record("login", time.monotonic() - start)
 
-        _LOGGER.info(f"Successfully initialised client id={self.entry.entry_id}")
+    async def async_connect(self):
+        """Log in, retrying with backoff until it succeeds.
 
-        # Log into the remote server
-        await self.hass.async_add_executor_job(
-            self.client.authenticate,
-            self.entry.data["email"],
-            self.entry.data["password"],
-        )
+        Returns False if the password or master code was rejected, retrying
+        can't fix that, so a reauth flow is started instead.
+        """
+        attempt = 0
+        while True:
+            try:
+                await self.async_login()
+                return True
+            except VisonicAuthError as err:
+                _LOGGER.error(f"Login to {self.panel_id} rejected: {err}")
+                self.login_rejected = True
+                self.entry.async_start_reauth(self.hass)
+                return False
+            except Exception as err:  # pylint: disable=broad-except
+                attempt += 1
+                delay = backoff_delay(attempt, LOGIN_RETRY_MAX_DELAY)
+                _LOGGER.warning(
+                    f"Login to {self.panel_id} failed, retrying in {delay:.0f}s: {err}"
+                )
+                await asyncio.sleep(delay)
 
-        _LOGGER.info(f"Successfully authenticated id={self.entry.entry_id}")
+    async def _async_login(self):
+        # Authenticate once per account, entries on the same login share it.
+        self.account = async_get_account(self.hass, self.entry)
+        await self.account.async_login()
 
-        # Quick check to confirm panels are registered.
-        panels = await self.hass.async_add_executor_job(self.client.get_panels)
-        if panels:
-            panel_ids = [panel.panel_serial for panel in panels]
-            _LOGGER.info(f"Available panels={panel_ids}")
+        if self.account.use_library:
+            await self._async_library_login()
+        else:
+            self.api = self.account.panel_api()
+        self.api.metrics = self.metrics
 
         _LOGGER.info(
             f"Attempt to log in to panel {self.panel_id} id={self.entry.entry_id}"
         )
 
         # Attempt to log into the panel
-        await self.hass.async_add_executor_job(
-            self.client.panel_login,
+        await self.api.async_panel_login(
             self.entry.data["panel_id"],
             self.entry.data["master_code"],
         )
@@ -67,35 +377,298 @@ class VisonicHandler:
         self.code = self.entry.data["master_code"]
 
         # Get the panel info
-        self.panel_info = await self.hass.async_add_executor_job(
-            self.client.get_panel_info
-        )
-        self.brand = self.panel_info.manufacturer
-        self.model = self.panel_info.model
+        self.panel_info = await self.api.async_get_panel_info()
+        self.brand = self.panel_info["manufacturer"]
+        self.model = self.panel_info["model"]
         self.connected = True
         _LOGGER.info(f"Login successful for {self.unique_id} id={self.entry.entry_id}")
+        self._async_save_session()
+
+    def restore(self) -> bool:
+        """Restore the cached session, panel info and status.
+
+        Returns True if there was enough to register entities without the cloud.
+        """
+        cache = self.store.data if self.store is not None else {}
+        if not cache.get("session_token") or not cache.get("panel_info"):
+            return False
+
+        self.account = async_get_account(self.hass, self.entry)
+        if not self.account.logged_in:
+            self.account.api.user_token = cache.get("user_token")
+        self.api = self.account.panel_api()
+        self.api.metrics = self.metrics
+        self.api.session_token = cache["session_token"]
+
+        self.codeless_arm = self.entry.data["codeless_arm"]
+        self.codeless_disarm = self.entry.data["codeless_disarm"]
+        self.code = self.entry.data["master_code"]
+
+        self.panel_info = cache["panel_info"]
+        self.brand = self.panel_info["manufacturer"]
+        self.model = self.panel_info["model"]
+        if status := cache.get("status"):
+            self._apply_status(status)
+        self._apply_devices(cache.get("devices", []))
+        _LOGGER.info(f"Restored cached session for {self.unique_id}")
+        return True
 
     @callback
-    def update(self, *args):
-        _LOGGER.info(f"Panel update for {self.panel_id}...")
-        self.hass.async_create_task(self.async_update())
+    def async_apply_options(self):
+        """Apply changed intervals and code policy, the session is kept."""
+        data = self.entry.data
+        self.codeless_arm = data["codeless_arm"]
+        self.codeless_disarm = data["codeless_disarm"]
+        self.code = data["master_code"]
+        self.scheduler.configure(
+            data.get("min_update_interval", DEFAULT_MIN_UPDATE_INTERVAL),
+            data["update_interval"],
+        )
+        if self.account is not None:
+            self.account.api.throttle.set_rate_limit(
+                data.get("rate_limit", DEFAULT_RATE_LIMIT)
+            )
+        # Entities recompute their code format and features.
+        self.async_publish(options=True)
+
+    async def async_resume(self):
+        """Revalidate a restored session, logging in again if it was rejected."""
+        await self.async_update()
+
+    async def _async_request(self, func, *args):
+        """Call the cloud, re-authenticating and retrying transient errors.
+
+        Repeated failures open the circuit breaker, which refuses calls until
+        its timeout passes so we don't hammer a degraded provider.
+        """
+        if self.login_rejected:
+            raise VisonicAuthError(f"Login to {self.panel_id} rejected, reauth needed")
+        self.breaker.check()
+        reauthenticated = False
+        attempt = 0
+        while True:
+            try:
+                result = await func(*args)
+            except VisonicAuthError:
+                if reauthenticated:
+                    self.breaker.record_failure()
+                    self.login_rejected = True
+                    raise
+                reauthenticated = True
+                try:
+                    await self._async_reauthenticate()
+                except VisonicApiError as err:
+                    # A rejected password counts too, or every poll logs in again.
+                    self.breaker.record_failure()
+                    if isinstance(err, VisonicAuthError):
+                        self.login_rejected = True
+                    raise
+                continue
+            except VisonicApiError as err:
+                attempt += 1
+                if attempt >= RETRY_ATTEMPTS:
+                    self.breaker.record_failure()
+                    raise
+                delay = backoff_delay(attempt)
+                _LOGGER.debug(f"Retrying {self.panel_id} in {delay:.1f}s: {err}")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _async_reauthenticate(self):
+        """Log into the panel again, or the account if its token expired too."""
+        _LOGGER.info(f"Session for {self.panel_id} rejected, logging in again")
+        if self.account is None or self.account.use_library:
+            await self.async_login()
+            return
+        try:
+            await self.api.async_panel_login(
+                self.entry.data["panel_id"], self.entry.data["master_code"]
+            )
+        except VisonicAuthError:
+            self.account.invalidate(self.api.user_token)
+            await self.account.async_login()
+            await self.api.async_panel_login(
+                self.entry.data["panel_id"], self.entry.data["master_code"]
+            )
+        self._async_save_session()
+
+    def _async_save_session(self):
+        if self.store is None or self.account is None or self.account.use_library:
+            return
+        self.store.async_update(
+            user_token=self.api.user_token,
+            session_token=self.api.session_token,
+            panel_info=self.panel_info,
+        )
+
+    async def _async_library_login(self):
+        """Run the full login sequence on a private library client."""
+        if isinstance(self.api, VisonicLibraryApi):
+            await self.api.async_close()
+        self.api = VisonicLibraryApi(
+            self.hass, self.entry.data["host"], self.entry.data["uuid"]
+        )
+        self.api.metrics = self.metrics
+        self.api.throttle = self.account.api.throttle
+        await self.api.async_check_version()
+
+        _LOGGER.info(f"Successfully initialised client id={self.entry.entry_id}")
+
+        # Log into the remote server
+        await self.api.async_authenticate(
+            self.entry.data["email"],
+            self.entry.data["password"],
+        )
+
+        _LOGGER.info(f"Successfully authenticated id={self.entry.entry_id}")
 
     async def async_update(self):
-        # TODO wrap in try/except
-
-        connected = await self.hass.async_add_executor_job(self.client.connected)
-        if connected:
-            self.connected = True
-            # Perform actions in update, get the status from the panel
-            self.panel_status = await self.hass.async_add_executor_job(
-                self.client.get_status
+        if self.api is None:
+            # Still logging in, the login refreshes once it is done.
+            _LOGGER.debug(f"Not logged in to {self.panel_id} yet, skipping poll")
+            return
+        if self._command_lock.locked():
+            # Polling is paused while a command is in flight, the command boosts
+            # the scheduler so the next poll follows right after.
+            _LOGGER.debug(f"Command in flight for {self.panel_id}, skipping poll")
+            return
+        requests_before = self.api.request_count
+        previous = self.status
+
+        # Connectivity and partition state both come from the one status request.
+        status = await self._async_request(self.api.async_get_status)
+        self._apply_status(status)
+        if self.store is not None:
+            self.store.async_update(status=status)
+
+        if self.connected:
+            # One bulk request covers every zone entity.
+            devices = await self._async_request(self.api.async_get_devices)
+            self._apply_devices(devices)
+            if self.store is not None:
+                self.store.async_update(devices=devices)
+
+            # The log mostly gains entries we care about when something changed,
+            # unchanged parts keep their instances.
+            changed = (
+                self.status.partitions is not previous.partitions
+                or self.status.zones is not previous.zones
             )
-            # _LOGGER.info(f"Status: {self.panel_status}")
-            # Map visonic fields to HA type fields.
+            if (
+                self.events.cursor is None
+                or changed
+                or self._events_pending
+                or time.monotonic() >= self._events_due
+            ):
+                self.events.process(
+                    await self._async_request(self.api.async_get_events)
+                )
+                self._events_due = time.monotonic() + EVENTS_INTERVAL
+            self._events_pending = changed
+
+        self.scheduler.next_interval(self.is_volatile)
+
+        self.poll_request_count = self.api.request_count - requests_before
+        self.async_publish()
+
+        _LOGGER.debug(
+            f"Panel update complete for {self.panel_id} "
+            f"(states={[item.state for item in self.status.partitions]}, "
+            f"requests={self.poll_request_count}, next={self.scheduler.interval}s)"
+        )
+
+    @callback
+    def async_publish(self, **payload):
+        """Push the current status, plus any extra payload, to the entities."""
+        async_dispatcher_send(
+            self.hass,
+            self.signal,
+            self.panel_id,
+            {
+                "connected": self.connected,
+                "partitions": dict(self.partitions),
+                "changed_by": {
+                    partition: self.events.get_changed_by(partition)
+                    for partition in self.partitions
+                },
+                **payload,
+            },
+        )
 
-            # TODO support multiple partitions
-            self.state = self.panel_status.partitions[0].state
+    def _apply_status(self, status):
+        # Fan the one status response out to every partition.
+        self.status = self.status.with_status(status)
+        if self.status.connected:
+            self._expected.clear()
+        self.connected = self.status.connected
+
+    def _apply_devices(self, devices):
+        self.status = self.status.with_devices(devices)
+
+    @property
+    def is_volatile(self) -> bool:
+        """Return True if a partition is in a state expected to change soon."""
+        return self.status.volatile
+
+    async def async_arm_home(self, partition=ALL_PARTITIONS):
+        await self._async_command("HOME", partition)
+
+    async def async_arm_away(self, partition=ALL_PARTITIONS):
+        await self._async_command("AWAY", partition)
+
+    async def async_disarm(self, partition=ALL_PARTITIONS):
+        await self._async_command("DISARM", partition)
+
+    async def _async_command(self, state, partition):
+        """Queue a command, joining an identical one still waiting for its turn."""
+        key = (state, partition)
+        if (task := self._commands.get(key)) is None:
+            task = self.async_create_task(self._async_run_command(state, partition))
+            self._commands[key] = task
+            task.add_done_callback(lambda _: self._release_command(key, task))
         else:
-            self.connected = False
+            _LOGGER.debug(f"Joining pending {state} for {self.panel_id}")
+        await asyncio.shield(task)
 
-        _LOGGER.info(f"Panel update complete for {self.panel_id} (state={self.state})")
+    def _release_command(self, key, task):
+        # A later command with the same key may already have taken the slot.
+        if self._commands.get(key) is task:
+            del self._commands[key]
+
+    async def _async_run_command(self, state, partition):
+        """Send the command once the ones before it are done, unless redundant."""
+        async with self._command_lock:
+            # Running now, a repeat must queue behind the commands after it.
+            self._release_command((state, partition), asyncio.current_task())
+            if self._is_redundant(state, partition):
+                _LOGGER.debug(f"Dropping {state} for {self.panel_id}, already {state}")
+                return
+            self.scheduler.boost()
+            await self._async_request(
+                getattr(self.api, COMMAND_METHODS[state]), partition
+            )
+            for target in self._command_targets(partition):
+                self._expected[target] = state
+        self.async_publish(command=state, partition=partition)
+
+    def _command_targets(self, partition):
+        return list(self.partitions) if partition == ALL_PARTITIONS else [partition]
+
+    def _is_redundant(self, state, partition) -> bool:
+        """Return True if every targeted partition is already in the state.
+
+        States of commands sent since the last status fetch take precedence.
+        """
+        targets = self._command_targets(partition)
+        if not self.connected or not targets:
+            return False
+        return all(
+            (
+                self._expected.get(target)
+                or getattr(self.partitions.get(target), "state", None)
+            )
+            == state
+            for target in targets
+        )
@@ -1,8 +1,9 @@
 """Config flow for Visonic Alarm integration."""
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 
@@ -10,51 +11,154 @@ from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .api import (
+    VisonicApiError,
+    VisonicAuthError,
+    VisonicCloudApi,
+    VisonicUnsupportedError,
+)
+from .const import (
+    CONNECTION_KEYS,
+    DOMAIN,
+    PENDING_SESSIONS,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_UPDATE_INTERVAL,
+)
 import uuid
-from visonic import alarm
+
+if TYPE_CHECKING:
+    from .client import VisonicLibraryApi
 
 _LOGGER = logging.getLogger(__name__)
 
+# Poll intervals in seconds, and requests per minute with 0 for no limit.
+SECONDS = vol.All(vol.Coerce(int), vol.Range(min=1))
+RATE_LIMIT = vol.All(vol.Coerce(int), vol.Range(min=0))
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required("host", default="visonic.tycomonitor.com"): str,
         vol.Required("email"): str,
         vol.Required("password"): str,
-        vol.Required("panel_id"): str,
-        vol.Required("master_code"): str,
         vol.Optional("codeless_arm", default=True): bool,
         vol.Optional("codeless_disarm", default=False): bool,
-        vol.Required("update_interval", default=60): int,
+        vol.Required("update_interval", default=DEFAULT_UPDATE_INTERVAL): SECONDS,
+        vol.Required(
+            "min_update_interval", default=DEFAULT_MIN_UPDATE_INTERVAL
+        ): SECONDS,
+        vol.Required("rate_limit", default=DEFAULT_RATE_LIMIT): RATE_LIMIT,
     }
 )
 
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect.
+async def async_validate_account(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> tuple[VisonicCloudApi | VisonicLibraryApi, list[str]]:
+    """Authenticate and list the panels of the account.
+
+    Returns the logged in client and the panel serials. Servers that need the
+    visonicalarm library give a library client and no serials.
+    """
+    api = VisonicCloudApi(async_get_clientsession(hass), data["host"], data["uuid"])
+    try:
+        await api.async_check_version()
+    except VisonicUnsupportedError:
+        return await _async_validate_library(hass, data), []
+    except VisonicApiError as err:
+        raise CannotConnect(f"{err}") from err
+
+    try:
+        await api.async_authenticate(data["email"], data["password"])
+    except VisonicAuthError as err:
+        raise InvalidAuth(f"{err}") from err
+    except VisonicApiError as err:
+        raise CannotConnect(f"{err}") from err
+
+    try:
+        panels = await api.async_get_panels()
+    except VisonicApiError as err:
+        raise CannotConnect(f"{err}") from err
+    return api, [panel["panel_serial"] for panel in panels]
 
-    Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+
+async def async_validate_panel(
+    api: VisonicCloudApi | VisonicLibraryApi, data: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Log into the panel, returning the session to seed the entry's cache.
+
+    Returns None for a library client, it keeps its session to itself.
     """
+    if not hasattr(api, "panel_api"):
+        try:
+            await api.async_panel_login(data["panel_id"], data["master_code"])
+        except VisonicApiError as err:
+            # The library doesn't tell a wrong serial or code from an outage.
+            raise InvalidCode(f"{err}") from err
+        await api.async_close()
+        return None
+    panel_api = api.panel_api()
+    try:
+        await panel_api.async_panel_login(data["panel_id"], data["master_code"])
+    except VisonicAuthError as err:
+        raise InvalidCode(f"{err}") from err
+    except VisonicApiError as err:
+        raise CannotConnect(f"{err}") from err
+
+    try:
+        panel_info = await panel_api.async_get_panel_info()
+    except VisonicApiError as err:
+        raise CannotConnect(f"{err}") from err
+    return {
+        "user_token": api.user_token,
+        "session_token": panel_api.session_token,
+        "panel_info": panel_info,
+    }
 
+
+async def _async_validate_library(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> VisonicLibraryApi:
+    # Only servers without our REST version need the library.
+    from .client import VisonicLibraryApi
+
+    api = VisonicLibraryApi(hass, data["host"], data["uuid"])
     try:
         # Connect to remote server
-        client = await hass.async_add_executor_job(
-            alarm.Setup, data["host"], data["uuid"]
-        )
-    except Exception as err:
+        await api.async_check_version()
+    except VisonicApiError as err:
         raise CannotConnect(f"{err}") from err
 
     try:
         # Log into the remote server
-        await hass.async_add_executor_job(
-            client.authenticate, data["email"], data["password"]
-        )
-    except Exception as err:
+        await api.async_authenticate(data["email"], data["password"])
+    except VisonicApiError as err:
         raise InvalidAuth(f"{err}") from err
+    return api
+
+
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    Data has the keys from STEP_USER_DATA_SCHEMA plus panel_id and master_code.
+    """
+    api, _ = await async_validate_account(hass, data)
+    session = await async_validate_panel(api, data)
 
     # Return info that you want to store in the config entry.
-    return {"title": f"Alarm Panel ({data['panel_id']})"}
+    return {"title": f"Alarm Panel ({data['panel_id']})", "session": session}
+
+
+@callback
+def async_keep_session(
+    hass: HomeAssistant, data: dict[str, Any], session: dict[str, Any] | None
+) -> None:
+    """Hand the validated session to the entry's first setup."""
+    if session is not None:
+        pending = hass.data.setdefault(DOMAIN, {}).setdefault(PENDING_SESSIONS, {})
+        pending[data["uuid"]] = session
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -62,6 +166,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._api: VisonicCloudApi | VisonicLibraryApi | None = None
+        self._panels: list[str] = []
+        self._reauth_entry: config_entries.ConfigEntry | None = None
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -71,13 +181,15 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Handle the account step."""
         errors: dict[str, str] = {}
         if user_input is not None:
             # Generate a UUID for the data before creating the entry - will allow for testing auth under the same UUID as the created entry.
             user_input["uuid"] = str(uuid.uuid4())
             try:
-                info = await validate_input(self.hass, user_input)
+                self._api, self._panels = await async_validate_account(
+                    self.hass, user_input
+                )
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -86,13 +198,101 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                # Create the entry.
-                return self.async_create_entry(title=info["title"], data=user_input)
+                self._data = user_input
+                return await self.async_step_panel()
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_panel(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick one of the account's panels and check its master code."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            await self.async_set_unique_id(user_input["panel_id"])
+            self._abort_if_unique_id_configured()
+            # Entries created before unique ids only have the serial in their data.
+            self._async_abort_entries_match({"panel_id": user_input["panel_id"]})
+            data = {**self._data, **user_input}
+            try:
+                session = await async_validate_panel(self._api, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidCode:
+                errors["base"] = "invalid_code"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                async_keep_session(self.hass, data, session)
+                return self.async_create_entry(
+                    title=f"Alarm Panel ({data['panel_id']})", data=data
+                )
+
+        # Serials are only known from the REST API, the library path asks for one.
+        panel_id = vol.In(self._panels) if self._panels else str
+        return self.async_show_form(
+            step_id="panel",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("panel_id"): panel_id,
+                    vol.Required("master_code"): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Start when the cloud rejected the entry's password or master code."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for the password and master code again."""
+        errors: dict[str, str] = {}
+        entry = self._reauth_entry
+        if user_input is not None:
+            data = {**entry.data, **user_input}
+            try:
+                info = await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except InvalidCode:
+                errors["base"] = "invalid_code"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                relogin = data["password"] != entry.data["password"]
+                async_keep_session(self.hass, data, info["session"])
+                self.hass.config_entries.async_update_entry(entry, data=data)
+                if not relogin:
+                    # A new password reloads from the update listener.
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(entry.entry_id)
+                    )
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("password"): str,
+                    vol.Required("master_code"): str,
+                }
+            ),
+            description_placeholders={"panel_id": entry.data["panel_id"]},
+            errors=errors,
+        )
+
 
 class OptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry):
@@ -116,7 +316,7 @@ class OptionsFlow(config_entries.OptionsFlow):
                 vol.Required("email", default=self.options.get("email")): str,
                 vol.Required("password", default=self.options.get("password")): str,
                 vol.Required("panel_id", default=self.options.get("panel_id")): str,
-                vol.Required("master_code", default=""): str,
+                vol.Optional("master_code"): str,
                 vol.Optional(
                     "codeless_arm",
                     default=self.options.get("codeless_arm", False),
@@ -128,24 +328,49 @@ class OptionsFlow(config_entries.OptionsFlow):
                 vol.Required(
                     "update_interval",
                     default=self.options.get("update_interval"),
-                ): int,
+                ): SECONDS,
+                vol.Required(
+                    "min_update_interval",
+                    default=self.options.get(
+                        "min_update_interval", DEFAULT_MIN_UPDATE_INTERVAL
+                    ),
+                ): SECONDS,
+                vol.Required(
+                    "rate_limit",
+                    default=self.options.get("rate_limit", DEFAULT_RATE_LIMIT),
+                ): RATE_LIMIT,
             }
         )
         if user_input is not None:
-            # Generate a UUID for the data before creating the entry - will allow for testing auth under the same UUID as the created entry.
-            user_input["uuid"] = str(uuid.uuid4())
-            try:
-                info = await validate_input(self.hass, user_input)
-            except CannotConnect:
-                errors["base"] = "cannot_connect"
-            except InvalidAuth:
-                errors["base"] = "invalid_auth"
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
-            else:
-                # Create the entry.
-                return self.async_create_entry(title=info["title"], data=user_input)
+            data = {**self.config_entry.data, **user_input}
+            # Left blank to keep the current code.
+            data["master_code"] = (
+                user_input.get("master_code") or self.config_entry.data["master_code"]
+            )
+            # Only a changed login is checked, the entry keeps its uuid.
+            if any(
+                data[key] != self.config_entry.data.get(key)
+                for key in (*CONNECTION_KEYS, "master_code")
+            ):
+                try:
+                    info = await validate_input(self.hass, data)
+                except CannotConnect:
+                    errors["base"] = "cannot_connect"
+                except InvalidAuth:
+                    errors["base"] = "invalid_auth"
+                except InvalidCode:
+                    errors["base"] = "invalid_code"
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Unexpected exception")
+                    errors["base"] = "unknown"
+                else:
+                    async_keep_session(self.hass, data, info["session"])
+            if not errors:
+                # The update listener applies the change to the running entry.
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry, data=data
+                )
+                return self.async_create_entry(title="", data={})
 
         return self.async_show_form(
             step_id="user", data_schema=data_schema, errors=errors
@@ -158,3 +383,7 @@ class CannotConnect(HomeAssistantError):
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+
+class InvalidCode(HomeAssistantError):
+    """Error to indicate the panel rejected the master code."""
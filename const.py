@@ -4,3 +4,70 @@ DOMAIN = "visonic_cloud"
 DOMAINCLIENT = f"{DOMAIN}_client"
 DOMAINDATA = f"{DOMAIN}_data"
 DOMAINCLIENTTASK = f"{DOMAIN}_client_task"
+# HA bus event fired for each new entry in the panel event log.
+EVENT_VISONIC = f"{DOMAIN}_event"
+# Key in hass.data[DOMAIN] holding the shared accounts by (host, email).
+ACCOUNTS = "accounts"
+# Key in hass.data[DOMAIN] holding the VisonicFleet shared by all entries.
+FLEET = "fleet"
+# Key in hass.data[DOMAIN] holding sessions validated by the config flow, by uuid.
+PENDING_SESSIONS = "pending_sessions"
+
+# Entry settings that need a new login, and a reload, when they change.
+CONNECTION_KEYS = ("host", "email", "password", "panel_id")
+
+# Polling, the interval backs off from the minimum to the maximum while stable.
+DEFAULT_UPDATE_INTERVAL = 60
+DEFAULT_MIN_UPDATE_INTERVAL = 5
+POLL_BACKOFF_FACTOR = 2
+# Seconds of fast polling after an arm/disarm command.
+FAST_POLL_WINDOW = 60
+# Fraction of the interval polls are randomly moved by, on top of their slot.
+POLL_JITTER = 0.05
+
+# Requests in flight at once per cloud host, across all entries.
+MAX_CONCURRENT_REQUESTS = 10
+# Requests per minute per account, 0 for no limit. An account polls about two
+# requests per panel per interval, any fixed default would throttle large ones.
+DEFAULT_RATE_LIMIT = 0
+
+# Visonic partition states/statuses where a change is expected within seconds.
+VOLATILE_STATES = (
+    "ARMING",
+    "DISARMING",
+    "EXIT",
+    "EXITDELAY",
+    "ENTRY",
+    "ENTRYDELAY",
+    "ALARM",
+    "TRIGGERED",
+)
+
+# Event log labels of arm and disarm events, spaces read as underscores.
+ARM_EVENT_LABELS = ("ARM", "ARM_HOME", "ARM_AWAY", "HOME", "AWAY", "DISARM")
+# Seconds between event log fetches while the panel status doesn't change.
+EVENTS_INTERVAL = 300
+
+# Retries of transient cloud errors, with jittered exponential backoff.
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 30
+# Longest wait between background login attempts while the cloud is unreachable.
+LOGIN_RETRY_MAX_DELAY = 300
+# Consecutive failed calls that open the circuit, and seconds it stays open.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 300
+
+# Confirmation polls after a command, the optimistic state is dropped on timeout.
+COMMAND_CONFIRM_INTERVAL = 3
+COMMAND_CONFIRM_TIMEOUT = 30
+
+# Service tracing the next poll cycles and commands of an entry, and the
+# seconds after which an unfinished trace is written anyway.
+SERVICE_PROFILE = "profile"
+PROFILE_TIMEOUT = 600
+
+# Visonic device warning types behind each zone binary sensor.
+WARNING_OPEN = ("OPENED",)
+WARNING_TAMPER = ("TAMPER", "TAMPERED")
+WARNING_LOW_BATTERY = ("LOW_BATTERY", "BATTERY_LOW")
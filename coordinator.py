@@ -0,0 +1,165 @@
+"""Polling coordinator for the Visonic Alarm integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .api import VisonicApiError, VisonicAuthError
+from .client import VisonicHandler
+from .const import DOMAIN
+from .fleet import async_get_fleet
+
+_LOGGER = logging.getLogger(__name__)
+
+# Refresh requests arriving within this many seconds are merged into one fetch.
+REQUEST_REFRESH_COOLDOWN = 2
+
+
+def _same(old, new) -> bool:
+    if isinstance(old, tuple) and isinstance(new, tuple):
+        # (partition status, changed by)
+        return old[0] is new[0] and old[1] == new[1]
+    return old is new
+
+
+class VisonicDataUpdateCoordinator(DataUpdateCoordinator):
+    """Poll a panel through its VisonicHandler and push the status to entities."""
+
+    def __init__(self, hass: HomeAssistant, client: VisonicHandler) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {client.panel_id}",
+            update_interval=timedelta(seconds=client.scheduler.interval),
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=True
+            ),
+        )
+        self.client = client
+        self.fleet = async_get_fleet(hass)
+        self._fetch_task: asyncio.Task | None = None
+        # Keys of what changed in the last refresh, None when everything may have.
+        self.changed: set | None = None
+        self._snapshot = None
+        self._notified_success: bool | None = None
+        # Called after every refresh, whether or not anything changed.
+        self._refresh_listeners: list[CALLBACK_TYPE] = []
+
+    async def async_resume(self) -> None:
+        """Revalidate a restored session as the next refresh."""
+        self._start_fetch(self.client.async_resume)
+        await self.async_refresh()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the panel status, sharing a fetch that is already in flight."""
+        if self._fetch_task is None:
+            self._start_fetch(self.client.async_update)
+        return await asyncio.shield(self._fetch_task)
+
+    def _start_fetch(self, fetch) -> None:
+        self._fetch_task = self.client.async_create_task(self._async_fetch(fetch))
+        self._fetch_task.add_done_callback(self._fetch_done)
+
+    def _fetch_done(self, task: asyncio.Task) -> None:
+        if self._fetch_task is task:
+            self._fetch_task = None
+
+    async def _async_fetch(self, fetch) -> dict[str, Any]:
+        try:
+            await fetch()
+        except VisonicAuthError as err:
+            self.changed = set()
+            # Starts a reauth flow and stops polling, the flow reloads the entry.
+            raise ConfigEntryAuthFailed(
+                f"Login to {self.client.panel_id} rejected: {err}"
+            ) from err
+        except VisonicApiError as err:
+            # Nothing new to push, only the availability change (if any).
+            self.changed = set()
+            if self.client.breaker.is_open:
+                # Pause polling until the circuit allows a trial call.
+                self.update_interval = timedelta(
+                    seconds=self.client.breaker.remaining
+                )
+            raise UpdateFailed(
+                f"Panel {self.client.panel_id} update failed: {err}"
+            ) from err
+        # Next poll is scheduled with the adaptive interval, moved towards this
+        # entry's slot so entries don't poll in lockstep.
+        self.update_interval = timedelta(
+            seconds=self.fleet.next_delay(
+                self.client.entry.entry_id, self.client.scheduler.interval
+            )
+        )
+        self._diff()
+        return self.client.status
+
+    def _diff(self) -> None:
+        """Compare the client's state with the previous refresh.
+
+        Unchanged partitions and devices keep their status instances, so they
+        are compared by identity.
+        """
+        snapshot = (
+            self.client.connected,
+            {
+                partition: (status, self.client.events.get_changed_by(partition))
+                for partition, status in self.client.partitions.items()
+            },
+            self.client.devices,
+        )
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None or previous[0] != snapshot[0]:
+            self.changed = None
+            return
+        self.changed = {
+            (kind, key)
+            for kind, old, new in (
+                ("partition", previous[1], snapshot[1]),
+                ("device", previous[2], snapshot[2]),
+            )
+            for key in old.keys() | new.keys()
+            if not _same(old.get(key), new.get(key))
+        }
+
+    def has_changed(self, key) -> bool:
+        """Return True if the last refresh changed the given partition/device."""
+        return self.changed is None or key in self.changed
+
+    @callback
+    def async_add_refresh_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Call update_callback after every refresh, returns a callback removing it."""
+        self._refresh_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._refresh_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners only when the data or availability changed."""
+        for update_callback in list(self._refresh_listeners):
+            update_callback()
+        if self.last_update_success != self._notified_success:
+            # Availability flipped, every entity has to write.
+            self.changed = None
+        elif self.changed is not None and not self.changed:
+            return
+        self._notified_success = self.last_update_success
+        super().async_update_listeners()
+        # Anything pushed outside a refresh (restore, commands) goes to everyone.
+        self.changed = None
@@ -0,0 +1,40 @@
+"""Diagnostics support for the Visonic Alarm integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"password", "master_code", "email", "uuid", "panel_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the cloud call metrics and poll state of a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data["client"]
+    coordinator = data["coordinator"]
+    return {
+        "entry": async_redact_data(
+            {"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT
+        ),
+        "poll": {
+            "interval": client.scheduler.interval,
+            "min_interval": client.scheduler.min_interval,
+            "max_interval": client.scheduler.max_interval,
+            "last_update_success": coordinator.last_update_success,
+            "request_count": client.request_count,
+            "requests_last_poll": client.poll_request_count,
+        },
+        "circuit": {
+            "open": client.breaker.is_open,
+            "failures": client.breaker.failures,
+            "remaining": client.breaker.remaining,
+        },
+        "operations": client.metrics.as_dict(),
+    }
@@ -0,0 +1,105 @@
+"""Base entity for Visonic zones and devices."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import VisonicDataUpdateCoordinator
+from .status import ZoneStatus
+
+
+@callback
+def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    create_entities,
+) -> None:
+    """Add the entities for each device, including devices enrolled later.
+
+    create_entities(coordinator, device) returns the entities for one device.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    added = set()
+
+    @callback
+    def async_add_devices():
+        entities = []
+        for device_id, device in coordinator.client.devices.items():
+            if device_id not in added:
+                added.add(device_id)
+                entities.extend(create_entities(coordinator, device))
+        if entities:
+            async_add_entities(entities)
+
+    async_add_devices()
+    entry.async_on_unload(coordinator.async_add_listener(async_add_devices))
+
+
+class VisonicDeviceEntity(CoordinatorEntity):
+    """An entity of a panel device, written only when its value changes."""
+
+    def __init__(
+        self,
+        coordinator: VisonicDataUpdateCoordinator,
+        device: ZoneStatus,
+        key: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._client = coordinator.client
+        self._device_id = device.id
+        name = device.name or device.location or f"Zone {device.id}"
+        device_unique_id = f"{self._client.unique_id} device {device.id}"
+        self._attr_unique_id = f"{device_unique_id} {key}"
+        self._attr_name = f"{name} {key.replace('_', ' ')}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_unique_id)},
+            manufacturer=self._client.brand,
+            model=device.subtype or device.device_type,
+            name=name,
+            via_device=(DOMAIN, self._client.unique_id),
+        )
+        self._written = None
+        self._update_value(device)
+
+    @property
+    def device(self) -> ZoneStatus | None:
+        return self._client.devices.get(self._device_id)
+
+    @property
+    def warnings(self) -> frozenset[str]:
+        """Return the warning types currently reported for the device."""
+        return device.warnings if (device := self.device) else frozenset()
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.device is not None
+
+    def _update_value(self, device: ZoneStatus) -> None:
+        """Set the entity attributes from the device."""
+        raise NotImplementedError
+
+    def _written_state(self):
+        return (self.available, self.state, self.extra_state_attributes)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # HA writes the state when the entity is added.
+        self._written = self._written_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it differs from what was last written."""
+        if not self.coordinator.has_changed(("device", self._device_id)):
+            return
+        if (device := self.device) is not None:
+            self._update_value(device)
+        written = self._written_state()
+        if written == self._written:
+            return
+        self._written = written
+        self.async_write_ha_state()
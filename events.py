@@ -0,0 +1,80 @@
+"""Panel event log ingestion for the Visonic Alarm integration."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import ARM_EVENT_LABELS, EVENT_VISONIC
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VisonicEventLog:
+    """Fire panel log entries newer than a persisted cursor on the HA bus.
+
+    The cloud returns the recent log in full, so entries at or below the
+    cursor are dropped and every entry is fired exactly once.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, panel_id: str, store):
+        self.hass = hass
+        self.entry_id = entry_id
+        self.panel_id = panel_id
+        self.store = store
+        self.cursor: int | None = store.data.get("event_cursor") if store else None
+        # Who last armed/disarmed each partition, by partition id.
+        self.changed_by: dict[int, str] = {}
+
+    @callback
+    def process(self, events: list[dict[str, Any]]) -> None:
+        """Fire the entries newer than the cursor and advance it."""
+        new = sorted(
+            (
+                event
+                for event in events
+                if event.get("event") is not None
+                and (self.cursor is None or event["event"] > self.cursor)
+            ),
+            key=lambda event: event["event"],
+        )
+        if not new:
+            if self.cursor is None:
+                # Empty log, every entry from now on is new.
+                self._advance(0)
+            return
+
+        # The first fetch only sets the cursor, history isn't replayed.
+        replay = self.cursor is not None
+        for event in new:
+            self._track_changed_by(event)
+            if replay:
+                self.hass.bus.async_fire(
+                    EVENT_VISONIC,
+                    {**event, "panel_id": self.panel_id, "entry_id": self.entry_id},
+                )
+
+        self._advance(new[-1]["event"])
+        _LOGGER.debug(f"{len(new)} events for {self.panel_id}, cursor={self.cursor}")
+
+    def _advance(self, cursor: int) -> None:
+        self.cursor = cursor
+        if self.store is not None:
+            self.store.async_update(event_cursor=cursor)
+
+    def _track_changed_by(self, event: dict[str, Any]) -> None:
+        label = (event.get("label") or "").upper().replace(" ", "_")
+        if label not in ARM_EVENT_LABELS:
+            return
+        who = event.get("appointment") or event.get("description")
+        if not (partitions := event.get("partitions")):
+            # Applies to the whole panel, under the None key.
+            self.changed_by = {None: who}
+            return
+        for partition in partitions:
+            self.changed_by[partition] = who
+
+    def get_changed_by(self, partition: int) -> str | None:
+        """Return who last armed/disarmed the partition."""
+        return self.changed_by.get(partition, self.changed_by.get(None))
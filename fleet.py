@@ -0,0 +1,149 @@
+"""Request load shared by every config entry of the Visonic Alarm integration.
+
+Entries created together would otherwise poll in lockstep. The fleet spreads
+their polls over the interval and bounds the requests sent to each host and
+account.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import random
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, FLEET, MAX_CONCURRENT_REQUESTS, POLL_JITTER
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per minute, in bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate / 60
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock in arrival order, only the first one sleeps.
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent, first come first served."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def charge(self) -> None:
+        """Take a token without waiting, the requests queued after it wait longer."""
+        self._refill()
+        self.tokens -= 1
+
+
+class RequestThrottle:
+    """Async context manager entered around every request of one account."""
+
+    def __init__(
+        self, semaphore: asyncio.Semaphore, limiter: RateLimiter | None
+    ) -> None:
+        self.semaphore = semaphore
+        self.limiter = limiter
+
+    def set_rate_limit(self, rate_limit: float) -> None:
+        """Change the requests per minute, 0 (or less) for no limit."""
+        self.limiter = (
+            RateLimiter(rate_limit, MAX_CONCURRENT_REQUESTS)
+            if rate_limit > 0
+            else None
+        )
+
+    async def __aenter__(self) -> None:
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        await self.semaphore.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def command(self) -> AsyncIterator[None]:
+        """Enter around an arm or disarm request instead of the throttle itself.
+
+        Commands count towards the rate limit but don't queue behind polls for
+        it, only for the host's concurrency limit.
+        """
+        if self.limiter is not None:
+            self.limiter.charge()
+        async with self.semaphore:
+            yield
+
+
+class VisonicFleet:
+    """Poll slots of the entries and request limits of the hosts."""
+
+    def __init__(self) -> None:
+        # Entry ids in registration order, each owns an evenly spaced slot.
+        self.entry_ids: list[str] = []
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @callback
+    def async_register(self, entry_id: str) -> CALLBACK_TYPE:
+        """Give the entry a poll slot, returns a callback releasing it."""
+        self.entry_ids.append(entry_id)
+
+        @callback
+        def async_unregister() -> None:
+            self.entry_ids.remove(entry_id)
+
+        return async_unregister
+
+    def next_delay(self, entry_id: str, interval: float) -> float:
+        """Return the delay before the entry's next poll.
+
+        The delay stays within half an interval of `interval`, moving the poll
+        towards the entry's slot, plus a little jitter.
+        """
+        if entry_id not in self.entry_ids or interval <= 0:
+            return max(1.0, interval)
+        slot = self.entry_ids.index(entry_id) / len(self.entry_ids) * interval
+        shift = (slot - (time.monotonic() + interval)) % interval
+        if shift > interval / 2:
+            shift -= interval
+        jitter = random.uniform(-POLL_JITTER, POLL_JITTER) * interval
+        return max(1.0, interval + shift + jitter)
+
+    def throttle(self, host: str, rate_limit: float) -> RequestThrottle:
+        """Return a throttle for a new account on the host.
+
+        Accounts on a host share its concurrency limit, the rate limit (requests
+        per minute, 0 for none) applies to the account alone.
+        """
+        if (semaphore := self.semaphores.get(host)) is None:
+            semaphore = self.semaphores[host] = asyncio.Semaphore(
+                MAX_CONCURRENT_REQUESTS
+            )
+        limiter = (
+            RateLimiter(rate_limit, MAX_CONCURRENT_REQUESTS)
+            if rate_limit > 0
+            else None
+        )
+        return RequestThrottle(semaphore, limiter)
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> VisonicFleet:
+    """Return the fleet of the integration, creating it if needed."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if (fleet := data.get(FLEET)) is None:
+        fleet = data[FLEET] = VisonicFleet()
+    return fleet
@@ -0,0 +1,76 @@
+"""Per-operation timing and outcome metrics for calls to the Visonic cloud."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+# Latency samples kept per operation for the percentiles.
+SAMPLE_SIZE = 100
+
+
+def percentile(samples, pct: float) -> float | None:
+    """Return the nearest-rank percentile of the samples, None if there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class OperationMetrics:
+    """Latency and outcome of one API operation."""
+
+    __slots__ = ("samples", "successes", "errors", "last_success", "last_error")
+
+    def __init__(self) -> None:
+        self.samples: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.successes = 0
+        self.errors = 0
+        self.last_success: datetime | None = None
+        self.last_error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        p50 = percentile(self.samples, 50)
+        p95 = percentile(self.samples, 95)
+        return {
+            "count": self.successes + self.errors,
+            "errors": self.errors,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "last_error": self.last_error,
+        }
+
+
+class ApiMetrics:
+    """Collect timings for every operation of one config entry."""
+
+    def __init__(self) -> None:
+        self.operations: dict[str, OperationMetrics] = {}
+
+    def record(
+        self, operation: str, seconds: float, error: Exception | None = None
+    ) -> None:
+        metrics = self.operations.setdefault(operation, OperationMetrics())
+        metrics.samples.append(seconds)
+        if error is None:
+            metrics.successes += 1
+            metrics.last_success = datetime.now(timezone.utc)
+        else:
+            metrics.errors += 1
+            metrics.last_error = repr(error)
+
+    def get(self, operation: str) -> OperationMetrics:
+        return self.operations.get(operation) or OperationMetrics()
+
+    @property
+    def errors(self) -> int:
+        return sum(metrics.errors for metrics in self.operations.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            operation: metrics.as_dict()
+            for operation, metrics in sorted(self.operations.items())
+        }
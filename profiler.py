@@ -0,0 +1,227 @@
+"""On-demand profiling of the poll and command paths of a config entry.
+
+The visonic_cloud.profile service (see services.py) traces the next poll
+cycles and commands of an entry. Each one is split into queue or executor
+wait, HTTP time, parsing and entity state writes. The trace is written as JSON, and a
+cProfile of the same window as a .prof file, to the config directory.
+
+Timing wrappers are set on the handler instance while a trace runs and
+removed afterwards. Nothing in the hot paths checks for a profiler when
+tracing is off.
+"""
+from __future__ import annotations
+
+import cProfile
+from collections import defaultdict
+from datetime import datetime
+import functools
+import inspect
+import json
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, PROFILE_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait after the last cycle for the entity writes that follow it.
+FINISH_DELAY = 1
+
+
+class VisonicProfiler:
+    """Trace the next poll cycles and commands of one VisonicHandler."""
+
+    def __init__(self, hass: HomeAssistant, client, cycles: int) -> None:
+        self.hass = hass
+        self.client = client
+        self.cycles = cycles
+        self.trace: list[dict[str, Any]] = []
+        self.started = datetime.now()
+        # Cycle being traced, and the last one, which gets the writes after it.
+        self._current: dict[str, Any] | None = None
+        self._last: dict[str, Any] | None = None
+        self._profile = cProfile.Profile()
+        self._patched: list[tuple[Any, str]] = []
+        self._cancel_timeout = None
+        self._finishing = False
+
+    @callback
+    def async_start(self) -> None:
+        client = self.client
+        api = client.api
+        self._patch(client, "async_update", self._wrap_cycle("poll"))
+        self._patch(client, "_async_run_command", self._wrap_cycle("command"))
+        self._patch(client, "_apply_status", self._wrap_phase("parse"))
+        self._patch(client, "_apply_devices", self._wrap_phase("parse"))
+        self._patch(client.events, "process", self._wrap_phase("parse"))
+        # Dispatching to the alarm entities and notifying the zone entities.
+        self._patch(client, "async_publish", self._wrap_phase("state_write"))
+        coordinator = self.hass.data[DOMAIN][client.entry.entry_id]["coordinator"]
+        self._patch(
+            coordinator, "async_update_listeners", self._wrap_phase("state_write")
+        )
+        if hasattr(api, "_send"):
+            # REST transport, anything outside _send is the throttle queue.
+            self._patch(api, "_send", self._wrap_phase("http"))
+            self._patch(api, "_request", self._wrap_phase("request"))
+        elif api is not None:
+            self._patch(api, "_async_timed_call", self._wrap_executor_call)
+        client.profiler = self
+        self._cancel_timeout = async_call_later(
+            self.hass, PROFILE_TIMEOUT, self._async_timeout
+        )
+        _LOGGER.info(
+            f"Profiling the next {self.cycles} cycles of {client.panel_id}"
+        )
+
+    def _patch(self, obj, name: str, wrap) -> None:
+        setattr(obj, name, wrap(getattr(obj, name)))
+        self._patched.append((obj, name))
+
+    def _wrap_cycle(self, kind: str):
+        def wrap(func):
+            @functools.wraps(func)
+            async def traced(*args, **kwargs):
+                if self._current is not None or self._finishing:
+                    # Nested in the cycle being traced, or past the last one.
+                    return await func(*args, **kwargs)
+                self._current = cycle = {
+                    "kind": kind,
+                    "start": time.time(),
+                    "phases": defaultdict(float),
+                }
+                start = time.monotonic()
+                try:
+                    self._profile.enable()
+                except ValueError:
+                    # Another profiler is active, keep the timings only.
+                    pass
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._profile.disable()
+                    cycle["total"] = time.monotonic() - start
+                    self._current = None
+                    self.trace.append(cycle)
+                    self._last = cycle
+                    if len(self.trace) >= self.cycles:
+                        self._finishing = True
+                        async_call_later(self.hass, FINISH_DELAY, self._async_finish)
+
+            return traced
+
+        return wrap
+
+    def _wrap_phase(self, phase: str):
+        def wrap(func):
+            if inspect.iscoroutinefunction(func):
+
+                async def timed(*args, **kwargs):
+                    start = time.monotonic()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self._add(phase, time.monotonic() - start)
+
+            else:
+
+                def timed(*args, **kwargs):
+                    start = time.monotonic()
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        self._add(phase, time.monotonic() - start)
+
+            return functools.wraps(func)(timed)
+
+        return wrap
+
+    def _wrap_executor_call(self, func):
+        @functools.wraps(func)
+        async def timed(call, *args):
+            submitted = time.monotonic()
+            times = []
+
+            def run(*run_args):
+                times.append(time.monotonic())
+                try:
+                    return call(*run_args)
+                finally:
+                    times.append(time.monotonic())
+
+            run.__name__ = call.__name__
+            try:
+                return await func(run, *args)
+            finally:
+                if len(times) == 2:
+                    self._add("executor_wait", times[0] - submitted)
+                    self._add("http", times[1] - times[0])
+
+        return timed
+
+    def _add(self, phase: str, seconds: float) -> None:
+        # Writes after a poll happen once it returned, they belong to it.
+        if (cycle := self._current or self._last) is not None:
+            cycle["phases"][phase] += seconds
+
+    @callback
+    def _async_timeout(self, _now) -> None:
+        self._cancel_timeout = None
+        _LOGGER.warning(
+            f"Profiling {self.client.panel_id} timed out after "
+            f"{len(self.trace)} of {self.cycles} cycles"
+        )
+        self.client.async_create_task(self._async_finish())
+
+    @callback
+    def async_stop(self) -> None:
+        """Remove the timing wrappers."""
+        if self._cancel_timeout is not None:
+            self._cancel_timeout()
+            self._cancel_timeout = None
+        for obj, name in reversed(self._patched):
+            # The instance attribute shadows the method, deleting restores it.
+            delattr(obj, name)
+        self._patched.clear()
+        if self.client.profiler is self:
+            self.client.profiler = None
+
+    async def _async_finish(self, _now=None) -> None:
+        if not self._patched:
+            return
+        self.async_stop()
+        base = self.hass.config.path(
+            f"{DOMAIN}_profile_{self.client.entry.entry_id}_"
+            f"{self.started:%Y%m%d%H%M%S}"
+        )
+        await self.hass.async_add_executor_job(self._write, base)
+        _LOGGER.info(f"Profile of {self.client.panel_id} written to {base}.json/.prof")
+
+    def _write(self, base: str) -> None:
+        cycles = []
+        for cycle in self.trace:
+            phases = cycle["phases"]
+            # The REST request time includes _send, the rest is queueing.
+            if "request" in phases:
+                phases["queue_wait"] = phases.pop("request") - phases.get("http", 0)
+            phases["other"] = cycle["total"] - sum(phases.values())
+            cycles.append(
+                {
+                    "kind": cycle["kind"],
+                    "start": cycle["start"],
+                    "total_ms": round(cycle["total"] * 1000, 3),
+                    "phases_ms": {
+                        phase: round(seconds * 1000, 3)
+                        for phase, seconds in phases.items()
+                    },
+                }
+            )
+        with open(f"{base}.json", "w", encoding="utf-8") as file:
+            json.dump(
+                {"panel_id": self.client.panel_id, "cycles": cycles}, file, indent=2
+            )
+        self._profile.dump_stats(f"{base}.prof")
@@ -0,0 +1,69 @@
+"""Retry backoff and circuit breaker for calls to the Visonic cloud."""
+from __future__ import annotations
+
+import random
+import time
+
+from .api import VisonicApiError
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+
+class VisonicCircuitOpenError(VisonicApiError):
+    """Error to indicate requests are paused after repeated failures."""
+
+
+def backoff_delay(attempt: int, max_delay: float = RETRY_MAX_DELAY) -> float:
+    """Return a full-jitter exponential delay for the given retry attempt."""
+    return random.uniform(0, min(max_delay, RETRY_BASE_DELAY * 2**attempt))
+
+
+class CircuitBreaker:
+    """Stop calling the cloud after consecutive failures.
+
+    Once open, calls are refused until the reset timeout passes, then a single
+    trial call is let through. Its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and self.remaining > 0
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds left before a trial call is allowed."""
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self) -> None:
+        """Raise if the circuit is open."""
+        if self.is_open:
+            raise VisonicCircuitOpenError(
+                f"Requests paused after {self.failures} failures, "
+                f"retrying in {self.remaining:.0f}s"
+            )
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            # (Re)open, a failed trial call restarts the timeout.
+            self.opened_at = time.monotonic()
@@ -0,0 +1,117 @@
+"""Device sensors for the Visonic Alarm integration."""
+from __future__ import annotations
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .entity import VisonicDeviceEntity, async_setup_device_entities
+from .status import ZoneStatus
+
+# Diagnostic sensors: key, unit, value from the VisonicHandler.
+DIAGNOSTIC_SENSORS = (
+    (
+        "status_latency_p50",
+        UnitOfTime.MILLISECONDS,
+        lambda client: client.metrics.get("get_status").as_dict()["p50_ms"],
+    ),
+    (
+        "status_latency_p95",
+        UnitOfTime.MILLISECONDS,
+        lambda client: client.metrics.get("get_status").as_dict()["p95_ms"],
+    ),
+    ("cloud_errors", None, lambda client: client.metrics.errors),
+    (
+        "last_status_success",
+        None,
+        lambda client: client.metrics.get("get_status").last_success,
+    ),
+    ("poll_interval", UnitOfTime.SECONDS, lambda client: client.scheduler.interval),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up a status sensor for every panel device."""
+
+    def create_entities(coordinator, device):
+        return [VisonicDeviceStatusSensor(coordinator, device, "status")]
+
+    async_setup_device_entities(hass, entry, async_add_entities, create_entities)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities(
+        VisonicDiagnosticSensor(coordinator, key, unit, value)
+        for key, unit, value in DIAGNOSTIC_SENSORS
+    )
+
+
+class VisonicDeviceStatusSensor(VisonicDeviceEntity, SensorEntity):
+    """Warnings reported for a device, "ok" when there are none."""
+
+    _attr_icon = "mdi:shield-check"
+
+    def _update_value(self, device: ZoneStatus) -> None:
+        warnings = sorted(self.warnings)
+        self._attr_native_value = ", ".join(warnings).lower() if warnings else "ok"
+        self._attr_extra_state_attributes = {
+            "device_type": device.device_type,
+            "subtype": device.subtype,
+            "zone_type": device.zone_type,
+            "location": device.location,
+            "warnings": warnings,
+        }
+
+
+class VisonicDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Cloud call metrics of the panel, disabled by default."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, key: str, unit: str | None, value) -> None:
+        super().__init__(coordinator)
+        client = coordinator.client
+        self._value = value
+        self._attr_unique_id = f"{client.unique_id} {key}"
+        # Named after the panel like its alarm entity, to tell panels apart.
+        self._attr_name = f"{client.unique_id} {key.replace('_', ' ')}"
+        self._attr_native_unit_of_measurement = unit
+        if key.startswith("last_"):
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+        elif key == "cloud_errors":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, client.unique_id)})
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Metrics change on every poll, even when the panel status doesn't.
+        self.async_on_remove(
+            self.coordinator.async_add_refresh_listener(self.async_write_ha_state)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Written by the refresh listener.
+        pass
+
+    @property
+    def available(self) -> bool:
+        # Metrics stay readable while the cloud is down.
+        return True
+
+    @property
+    def native_value(self):
+        return self._value(self.coordinator.client)
@@ -0,0 +1,45 @@
+"""Services of the Visonic Alarm integration."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, SERVICE_PROFILE
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required("config_entry_id"): cv.string,
+        vol.Optional("cycles", default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the profile service, once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def async_profile(call: ServiceCall) -> None:
+        entry_id = call.data["config_entry_id"]
+        if (data := hass.data.get(DOMAIN, {}).get(entry_id)) is None:
+            raise HomeAssistantError(f"No loaded Visonic entry {entry_id}")
+        client = data["client"]
+        if client.profiler is not None:
+            raise HomeAssistantError(f"{client.panel_id} is already being profiled")
+        if client.api is None:
+            raise HomeAssistantError(f"{client.panel_id} is not logged in yet")
+        # Only imported when profiling, it pulls in cProfile.
+        from .profiler import VisonicProfiler
+
+        # Unloading the entry stops it, see VisonicHandler.async_close.
+        VisonicProfiler(hass, client, call.data["cycles"]).async_start()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
@@ -0,0 +1,170 @@
+"""Immutable panel status snapshots for the Visonic Alarm integration.
+
+The cloud's status and device responses are parsed once into these. Parts
+that did not change keep the previous instances, so comparing snapshots is
+mostly an identity check.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any
+
+from homeassistant.const import (
+    STATE_ALARM_ARMED_AWAY,
+    STATE_ALARM_ARMED_HOME,
+    STATE_ALARM_DISARMED,
+    STATE_UNKNOWN,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import VOLATILE_STATES, WARNING_OPEN
+
+# HA alarm state of each Visonic partition state.
+ALARM_STATES = {
+    "DISARM": STATE_ALARM_DISARMED,
+    "HOME": STATE_ALARM_ARMED_HOME,
+    "AWAY": STATE_ALARM_ARMED_AWAY,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class PartitionStatus:
+    """State of one partition."""
+
+    id: int
+    # Raw Visonic state and status, e.g. "AWAY" and "EXIT".
+    state: str
+    status: str
+    alarm_state: str
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PartitionStatus:
+        state = data.get("state") or ""
+        return cls(
+            data["id"],
+            state,
+            data.get("status") or "",
+            ALARM_STATES.get(state, STATE_UNKNOWN),
+        )
+
+    @property
+    def volatile(self) -> bool:
+        """Return True if the partition is expected to change within seconds."""
+        return self.state in VOLATILE_STATES or self.status in VOLATILE_STATES
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneStatus:
+    """A device of the panel (zone, keyfob, siren...) and its warnings."""
+
+    id: int
+    name: str | None
+    location: str | None
+    device_type: str | None
+    subtype: str | None
+    zone_type: str | None
+    # Warning types, e.g. "OPENED" or "LOW_BATTERY".
+    warnings: frozenset[str]
+    partitions: tuple[int, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ZoneStatus:
+        return cls(
+            data["id"],
+            data.get("name"),
+            data.get("location"),
+            data.get("device_type"),
+            data.get("subtype"),
+            data.get("zone_type"),
+            frozenset(
+                warning.get("type") if isinstance(warning, dict) else warning
+                for warning in data.get("warnings") or []
+            ),
+            tuple(data.get("partitions") or ()),
+        )
+
+
+def _reuse(previous: tuple, items: list) -> tuple:
+    """Return the items, swapping in the previous instance of each equal one."""
+    known = {item.id: item for item in previous}
+    items = [
+        old if (old := known.get(item.id)) == item else item for item in items
+    ]
+    if len(items) == len(previous) and all(
+        new is old for new, old in zip(items, previous)
+    ):
+        return previous
+    return tuple(items)
+
+
+@dataclass(frozen=True, slots=True)
+class PanelStatus:
+    """Snapshot of a panel, updated by replacing the parts that were fetched."""
+
+    connected: bool = False
+    partitions: tuple[PartitionStatus, ...] = ()
+    zones: tuple[ZoneStatus, ...] = ()
+    # When the status and device list were last fetched.
+    updated: datetime | None = None
+    zones_updated: datetime | None = None
+    # Partitions and zones by id, derived from the tuples.
+    _partitions: dict[int, PartitionStatus] = field(
+        init=False, repr=False, compare=False
+    )
+    _zones: dict[int, ZoneStatus] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "_partitions", {item.id: item for item in self.partitions}
+        )
+        object.__setattr__(self, "_zones", {item.id: item for item in self.zones})
+
+    def with_status(self, data: dict[str, Any]) -> PanelStatus:
+        """Return the snapshot updated from a status response.
+
+        A disconnected panel reports no partitions, the last known ones are kept.
+        """
+        if not data.get("connected"):
+            return replace(self, connected=False, updated=dt_util.utcnow())
+        partitions = _reuse(
+            self.partitions,
+            [PartitionStatus.from_dict(item) for item in data["partitions"]],
+        )
+        return replace(
+            self, connected=True, partitions=partitions, updated=dt_util.utcnow()
+        )
+
+    def with_devices(self, devices: list[dict[str, Any]]) -> PanelStatus:
+        """Return the snapshot updated from the device list."""
+        zones = _reuse(self.zones, [ZoneStatus.from_dict(item) for item in devices])
+        return replace(self, zones=zones, zones_updated=dt_util.utcnow())
+
+    def partition(self, partition_id: int) -> PartitionStatus | None:
+        return self._partitions.get(partition_id)
+
+    def zone(self, zone_id: int) -> ZoneStatus | None:
+        return self._zones.get(zone_id)
+
+    @property
+    def partitions_by_id(self) -> dict[int, PartitionStatus]:
+        return self._partitions
+
+    @property
+    def zones_by_id(self) -> dict[int, ZoneStatus]:
+        return self._zones
+
+    @property
+    def volatile(self) -> bool:
+        """Return True if a partition is in a state expected to change soon."""
+        return self.connected and any(item.volatile for item in self.partitions)
+
+    @property
+    def troubles(self) -> tuple[tuple[int, str], ...]:
+        """Return (zone id, warning) for every warning other than an open zone."""
+        return tuple(
+            (zone.id, warning)
+            for zone in self.zones
+            for warning in sorted(zone.warnings)
+            if warning not in WARNING_OPEN
+        )
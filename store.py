@@ -0,0 +1,45 @@
+"""Persistent session and status cache for the Visonic Alarm integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing, coalescing saves from consecutive polls.
+STORAGE_SAVE_DELAY = 30
+
+
+class VisonicStore:
+    """Keep the tokens, panel info and last status of an entry across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.data: dict[str, Any] = {}
+
+    async def async_load(self) -> dict[str, Any]:
+        self.data = await self._store.async_load() or {}
+        return self.data
+
+    def async_update(self, **changes: Any) -> None:
+        """Merge the changes and schedule a write if anything differs."""
+        if all(self.data.get(key) == value for key, value in changes.items()):
+            return
+        self.data.update(changes)
+        self._store.async_delay_save(lambda: self.data, STORAGE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write a pending delayed save now, so a reload reads current data."""
+        if self.data:
+            await self._store.async_save(self.data)
+
+    async def async_reset(self) -> None:
+        """Drop everything cached, saving right away."""
+        self.data = {}
+        await self._store.async_save(self.data)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()